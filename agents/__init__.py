@@ -1,13 +1,18 @@
 """Agents package for AI Mock Interview"""
 
+from .config import Settings, get_settings
 from .stage_manager import StageManager, InterviewStage
 from .llm_client import LLMClient
+from .response_cache import ResponseCache
 from .ollama_llm import OllamaLLM
 
 __all__ = [
+    "Settings",
+    "get_settings",
     "StageManager",
     "InterviewStage",
     "LLMClient",
+    "ResponseCache",
     "OllamaLLM",
 ]
 
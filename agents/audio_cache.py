@@ -0,0 +1,131 @@
+"""
+Audio Cache - Pre-synthesized audio for fixed agent utterances
+Frames are keyed by (TTS provider, voice, text), kept in memory and persisted
+to disk so new worker processes can play them without a TTS round-trip.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, Tuple
+from livekit import rtc
+
+logger = logging.getLogger(__name__)
+
+# Frames are re-chunked to 20 ms when loaded from disk
+_FRAME_MS = 20
+
+
+def tts_identity(tts: Any) -> Tuple[str, str]:
+    """Best-effort (provider, voice) identity of a TTS instance"""
+    provider = f"{type(tts).__module__}.{type(tts).__name__}"
+    opts = getattr(tts, "_opts", None)
+    model = getattr(opts, "model", None) or getattr(tts, "model", None) or ""
+    voice = getattr(opts, "voice", None) or getattr(tts, "voice", None) or "default"
+    return provider, f"{model}:{voice}"
+
+
+def cache_key(provider: str, voice: str, text: str) -> str:
+    return hashlib.sha256(json.dumps([provider, voice, text]).encode()).hexdigest()
+
+
+class AudioFrameCache:
+    """In-memory + on-disk cache of synthesized audio frames"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self._frames: Dict[str, List[rtc.AudioFrame]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load_from_disk(self) -> int:
+        """Load every cached utterance from disk into memory (sync, for prewarm)"""
+        if not self.cache_dir.exists():
+            return 0
+        loaded = 0
+        for meta_path in self.cache_dir.glob("*.json"):
+            key = meta_path.stem
+            try:
+                self._frames[key] = self._read(key)
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Skipping unreadable audio cache entry {key}: {e}")
+        return loaded
+
+    def _read(self, key: str) -> List[rtc.AudioFrame]:
+        meta = json.loads((self.cache_dir / f"{key}.json").read_text())
+        pcm = (self.cache_dir / f"{key}.pcm").read_bytes()
+        sample_rate = meta["sample_rate"]
+        num_channels = meta["num_channels"]
+        samples_per_frame = sample_rate * _FRAME_MS // 1000
+        bytes_per_frame = samples_per_frame * num_channels * 2  # 16-bit PCM
+        frames = []
+        for offset in range(0, len(pcm), bytes_per_frame):
+            chunk = pcm[offset:offset + bytes_per_frame]
+            frames.append(rtc.AudioFrame(
+                data=chunk,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                samples_per_channel=len(chunk) // (num_channels * 2),
+            ))
+        return frames
+
+    def _write(self, key: str, frames: List[rtc.AudioFrame], text: str):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        pcm = b"".join(bytes(frame.data) for frame in frames)
+        (self.cache_dir / f"{key}.pcm").write_bytes(pcm)
+        # Metadata last, so a partially written entry is never loaded
+        (self.cache_dir / f"{key}.json").write_text(json.dumps({
+            "sample_rate": frames[0].sample_rate,
+            "num_channels": frames[0].num_channels,
+            "text": text,
+        }))
+
+    def get(self, tts: Any, text: str) -> Optional[List[rtc.AudioFrame]]:
+        """Cached frames for this TTS voice and text, if any"""
+        frames = self._frames.get(cache_key(*tts_identity(tts), text))
+        if frames:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return frames
+
+    async def warm(self, tts: Any, texts: Iterable[str]):
+        """Synthesize and store any of the given utterances that are not cached yet"""
+        provider, voice = tts_identity(tts)
+        for text in texts:
+            key = cache_key(provider, voice, text)
+            if key in self._frames:
+                continue
+            try:
+                frames = []
+                async with tts.synthesize(text) as stream:
+                    async for audio in stream:
+                        frames.append(audio.frame)
+                if not frames:
+                    continue
+                self._frames[key] = frames
+                await asyncio.to_thread(self._write, key, frames, text)
+                logger.info(f"Cached TTS audio for: {text[:50]}...")
+            except Exception as e:
+                logger.warning(f"Could not pre-synthesize '{text[:30]}...': {e}")
+
+
+async def _iter_frames(frames: List[rtc.AudioFrame]) -> AsyncGenerator[rtc.AudioFrame, None]:
+    for frame in frames:
+        yield frame
+
+
+async def say_cached(
+    session: Any,
+    text: str,
+    cache: Optional[AudioFrameCache],
+    allow_interruptions: bool = True
+):
+    """session.say() that plays pre-synthesized frames when available"""
+    frames = cache.get(session.tts, text) if cache and session.tts else None
+    if frames:
+        return await session.say(text, audio=_iter_frames(frames), allow_interruptions=allow_interruptions)
+    return await session.say(text, allow_interruptions=allow_interruptions)
@@ -3,7 +3,7 @@ Base Agent - Common functionality for all interview agents
 """
 
 import logging
-from typing import Optional
+from typing import Optional, AsyncIterable
 from livekit import agents, rtc
 from livekit.agents import (
     AutoSubscribe,
@@ -16,8 +16,12 @@ from livekit.agents.pipeline import VoicePipelineAgent
 from livekit.agents.voice_assistant import VoiceAssistant
 from livekit.plugins import openai, silero
 
-from .stage_manager import StageManager, InterviewStage
+from .stage_manager import StageManager
+from .stage_graph import stage_id
 from .llm_client import LLMClient
+from .sentence_stream import stream_sentences
+from .context_window import ContextWindow
+from .turn_metrics import TurnTimer, time_first_chunk
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +31,7 @@ class BaseInterviewAgent(VoicePipelineAgent):
     
     def __init__(
         self,
-        stage: InterviewStage,
+        stage: str,
         stage_manager: StageManager,
         llm_client: LLMClient,
         system_prompt: str,
@@ -35,12 +39,27 @@ class BaseInterviewAgent(VoicePipelineAgent):
         **kwargs
     ):
         super().__init__(*args, **kwargs)
-        self.stage = stage
+        self.stage = stage_id(stage)
         self.stage_manager = stage_manager
         self.llm_client = llm_client
         self.system_prompt = system_prompt
         self.follow_up_count = 0
-        self.max_follow_ups = 2
+        self.max_follow_ups = stage_manager.graph.spec(self.stage).max_follow_ups
+        
+        # Token-budgeted prompt context for this stage (the agent's only history)
+        agent_config = stage_manager.config.get("agents", {}).get(self.stage, {})
+        self.context_window = ContextWindow(
+            token_budget=agent_config.get("context_token_budget", 600),
+            summary_max_chars=agent_config.get("summary_max_chars", 400)
+        )
+        
+        # Turn whose reply has been handed to TTS but has not started playing yet
+        self._playout_turn: Optional[TurnTimer] = None
+        self.on("agent_started_speaking", self._on_agent_started_speaking)
+    
+    def record_turn(self, role: str, content: str):
+        """Record a conversation turn in the prompt context window"""
+        self.context_window.append(role, content)
         
     async def on_participant_connected(self, participant: rtc.RemoteParticipant):
         """Called when a participant connects"""
@@ -50,6 +69,34 @@ class BaseInterviewAgent(VoicePipelineAgent):
         """Called when a participant disconnects"""
         logger.info(f"Participant {participant.identity} disconnected")
     
+    def _on_agent_started_speaking(self, *args):
+        """Pipeline event: the reply's audio started playing out"""
+        turn, self._playout_turn = self._playout_turn, None
+        if turn:
+            turn.mark("playout_start")
+    
+    def start_turn(self) -> TurnTimer:
+        """
+        Start timing a turn. These agents only see the committed transcript,
+        so their turns are timed from STT final rather than end of speech.
+        """
+        return TurnTimer(self.stage)
+    
+    async def speak_stream(self, chunks: AsyncIterable[str], turn: Optional[TurnTimer] = None) -> str:
+        """
+        Speak an LLM token stream sentence by sentence as it is generated.
+        Returns the full assembled response text.
+        """
+        sentences = []
+        async for sentence in stream_sentences(time_first_chunk(chunks, turn)):
+            if not sentences:
+                logger.info(f"Agent responding: {sentence[:100]}...")
+                # Playout start is marked when the audio actually starts, not here
+                self._playout_turn = turn
+            sentences.append(sentence)
+            await self.say(sentence, allow_interruptions=True)
+        return " ".join(sentences)
+    
     async def should_speak(self) -> bool:
         """Check if agent should speak based on current stage"""
         return await self.stage_manager.should_agent_speak(self.stage)
@@ -64,11 +111,10 @@ class BaseInterviewAgent(VoicePipelineAgent):
         
         # Check if we should transition based on follow-ups or duration
         stage_duration = await self.stage_manager.get_stage_duration()
-        stage_config = self.stage_manager.config.get("stages", {}).get(self.stage.value, {})
-        max_duration = stage_config.get("max_duration_seconds", 45)
+        max_duration = self.stage_manager.graph.spec(self.stage).max_duration or 45
         
         if self.follow_up_count >= self.max_follow_ups or stage_duration >= max_duration:
-            logger.info(f"Transitioning from {self.stage.value} after {stage_duration}s")
+            logger.info(f"Transitioning from {self.stage} after {stage_duration}s")
             await self.stage_manager.transition_to_next()
             return False
         
@@ -0,0 +1,57 @@
+"""
+Batch - Result types and aggregate stats for LLMClient.generate_many
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any
+
+
+@dataclass
+class BatchItem:
+    """Outcome of one prompt in a batch"""
+    index: int
+    prompt: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """All batch items (in prompt order) plus aggregate stats"""
+    items: List[BatchItem]
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def texts(self) -> List[Optional[str]]:
+        return [item.text for item in self.items]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_batch(items: List[BatchItem], wall_time: float) -> Dict[str, Any]:
+    """Aggregate counts, latency percentiles and throughput for a batch"""
+    latencies = sorted(item.latency for item in items)
+    succeeded = sum(1 for item in items if item.ok)
+    timed_out = sum(1 for item in items if item.timed_out)
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "timed_out": timed_out,
+        "wall_time_seconds": wall_time,
+        "items_per_second": len(items) / wall_time if wall_time > 0 else 0.0,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "latency_max": latencies[-1] if latencies else 0.0,
+    }
@@ -0,0 +1,161 @@
+"""
+Config - Process-wide, frozen view of config/settings.yaml
+The file is parsed once, ``${VAR}`` / ``${VAR:-default}`` placeholders are
+expanded from the environment, and the result is deep-frozen and shared by
+every component. When the file's mtime changes the registry parses it again
+and swaps in the new snapshot atomically; holders of the old one keep a
+consistent view.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config" / "settings.yaml"
+
+# ${VAR} or ${VAR:-default}
+_PLACEHOLDER = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _expand(value: Any) -> Any:
+    """Expand environment placeholders in every string of a parsed YAML tree"""
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    expanded = _PLACEHOLDER.sub(lambda m: os.getenv(m.group(1), m.group(2) or ""), value)
+    # A value that is just one placeholder takes the YAML type of its
+    # expansion, so "${REDIS_PORT:-6379}" becomes the integer 6379
+    if _PLACEHOLDER.fullmatch(value) and expanded:
+        try:
+            typed = yaml.safe_load(expanded)
+            if isinstance(typed, (int, float, bool)):
+                return typed
+        except yaml.YAMLError:
+            pass
+    return expanded
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Settings(Mapping):
+    """
+    Immutable, fully expanded configuration snapshot.
+    Reads like the parsed YAML dict (``settings.get("llm", {})``), plus typed
+    accessors for the sections most components need.
+    """
+
+    __slots__ = ("_data", "path", "mtime")
+
+    def __init__(self, data: Dict[str, Any], path: Optional[Path] = None, mtime: float = 0.0):
+        object.__setattr__(self, "_data", _freeze(_expand(data or {})))
+        object.__setattr__(self, "path", path)
+        object.__setattr__(self, "mtime", mtime)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Settings are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Settings(path={self.path}, sections={list(self._data)})"
+
+    def section(self, name: str) -> Mapping:
+        """A top-level section, or an empty mapping if it is missing"""
+        value = self._data.get(name)
+        return value if isinstance(value, Mapping) else _EMPTY
+
+    def stage_config(self, stage: str) -> Mapping:
+        return self.section("stages").get(stage, _EMPTY)
+
+    def agent_config(self, stage: str) -> Mapping:
+        return self.section("agents").get(stage, _EMPTY)
+
+    @classmethod
+    def load(cls, path: Path) -> "Settings":
+        """Parse and freeze a settings file"""
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+        return cls(data, path=Path(path), mtime=mtime)
+
+
+class ConfigRegistry:
+    """Holds the current Settings for one file and reloads it when its mtime changes"""
+
+    def __init__(self, path: Path = DEFAULT_CONFIG_PATH, check_interval: float = 2.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._settings: Optional[Settings] = None
+        self._next_check = 0.0
+
+    def get(self) -> Settings:
+        """Current snapshot; stats the file at most once per check_interval"""
+        settings = self._settings
+        now = time.monotonic()
+        if settings is not None and now < self._next_check:
+            return settings
+
+        with self._lock:
+            if self._settings is not None and now < self._next_check:
+                return self._settings
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if self._settings is None or mtime != self._settings.mtime:
+                    loaded = Settings.load(self.path)
+                    if self._settings is not None:
+                        self.reloads += 1
+                        logger.info(f"Reloaded config from {self.path}")
+                    # Single reference assignment - readers see old or new, never a mix
+                    self._settings = loaded
+            except Exception as e:
+                if self._settings is None:
+                    raise
+                logger.error(f"Failed to reload config from {self.path}, keeping previous: {e}")
+            return self._settings
+
+
+# One registry per settings file, shared by the whole process
+_registries: Dict[Path, ConfigRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_settings(path: Optional[Path] = None) -> Settings:
+    """Get the current settings snapshot for this process (parsed on first use)"""
+    path = Path(path) if path is not None else DEFAULT_CONFIG_PATH
+    registry = _registries.get(path)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(path, ConfigRegistry(path))
+    return registry.get()
@@ -0,0 +1,120 @@
+"""
+Context Window - Packs conversation history into a token budget
+Keeps a running token count so each turn only costs the new message, and
+folds evicted turns into a short rolling summary.
+"""
+
+import re
+from collections import deque
+from typing import Deque, List, Dict, Tuple
+
+# Rough per-message overhead for role markers/separators
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+_FIRST_SENTENCE = re.compile(r'^(.+?[.!?])(\s|$)', re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+class RollingSummary:
+    """Extractive summary of evicted turns: the first sentence of each, newest kept"""
+
+    def __init__(self, max_chars: int = 400):
+        self.max_chars = max_chars
+        self._points: Deque[str] = deque()
+        self._length = 0
+
+    def add(self, role: str, content: str):
+        """Fold an evicted turn into the summary"""
+        content = content.strip()
+        if not content:
+            return
+        match = _FIRST_SENTENCE.match(content)
+        sentence = match.group(1) if match else content
+        if len(sentence) > 160:
+            sentence = sentence[:157].rstrip() + "..."
+        point = f"{'Candidate' if role == 'user' else 'Interviewer'}: {sentence}"
+        self._points.append(point)
+        self._length += len(point) + 1
+        while self._length > self.max_chars and len(self._points) > 1:
+            self._length -= len(self._points.popleft()) + 1
+
+    def text(self) -> str:
+        return " ".join(self._points)
+
+    def __bool__(self) -> bool:
+        return bool(self._points)
+
+
+class ContextWindow:
+    """
+    Token-budgeted view of the most recent conversation turns.
+    When the budget is exceeded the oldest turns are evicted down to a low
+    watermark (so the kept prefix stays stable for several turns) and
+    summarized.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 600,
+        low_watermark: float = 0.75,
+        summary_max_chars: int = 400
+    ):
+        self.token_budget = token_budget
+        self.low_watermark = low_watermark
+        self.summary = RollingSummary(max_chars=summary_max_chars)
+        self._turns: Deque[Tuple[str, str, int]] = deque()
+        self._token_count = 0
+
+    @property
+    def token_count(self) -> int:
+        """Running token estimate of the turns currently in the window"""
+        return self._token_count
+
+    def append(self, role: str, content: str):
+        """Add a turn, evicting the oldest ones if the budget is exceeded"""
+        tokens = estimate_tokens(content) + _MESSAGE_OVERHEAD_TOKENS
+        self._turns.append((role, content, tokens))
+        self._token_count += tokens
+
+        if self._token_count > self.token_budget:
+            target = int(self.token_budget * self.low_watermark)
+            # Always keep the newest turn, even if it alone exceeds the budget
+            while self._token_count > target and len(self._turns) > 1:
+                old_role, old_content, old_tokens = self._turns.popleft()
+                self._token_count -= old_tokens
+                self.summary.add(old_role, old_content)
+
+    def turns(self) -> List[Dict[str, str]]:
+        """Turns currently in the window as role/content dicts"""
+        return [{"role": role, "content": content} for role, content, _ in self._turns]
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        """
+        Window as chat messages: the rolling summary (if any) followed by the
+        kept turns. Between evictions this list only ever grows at the end, so
+        it forms a stable prefix for the model's prompt cache.
+        """
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Earlier in the conversation: {self.summary.text()}"
+            })
+        messages.extend(self.turns())
+        return messages
+
+    def render(self) -> str:
+        """Render the window as prompt text, prefixed with the rolling summary"""
+        lines = []
+        if self.summary:
+            lines.append(f"Earlier in the conversation: {self.summary.text()}")
+            lines.append("")
+        lines.extend(f"{role}: {content}" for role, content, _ in self._turns)
+        return "\n".join(lines)
+
+    def __len__(self) -> int:
+        return len(self._turns)
@@ -0,0 +1,110 @@
+"""
+Conversation History - Bounded per-session record of conversation turns
+A fixed-size ring buffer of compact turns; turns that fall out of the buffer
+are folded into a rolling extractive summary, so memory stays flat no matter
+how long the interview runs.
+"""
+
+import time
+from collections import deque
+from collections.abc import Sequence
+from typing import Deque, Dict, Iterator, List, Optional
+
+from .context_window import RollingSummary
+
+
+class Turn:
+    """One conversation turn (slotted - no per-instance __dict__)"""
+
+    __slots__ = ("role", "content", "timestamp")
+
+    def __init__(self, role: str, content: str, timestamp: float):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+    def __repr__(self) -> str:
+        return f"Turn({self.role!r}, {self.content[:40]!r})"
+
+
+class RecentTurns(Sequence):
+    """Read-only view of the ring buffer (oldest first); indexing reads the ring directly"""
+
+    __slots__ = ("_turns",)
+
+    def __init__(self, turns: Deque[Turn]):
+        self._turns = turns
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._turns[i] for i in range(*index.indices(len(self._turns)))]
+        return self._turns[index]
+
+
+class ConversationHistory:
+    """
+    Ring buffer of the most recent turns plus a rolling summary of older ones.
+    Appending is O(1), and so is getting the recent-context view: it is a
+    live view over the ring, not a copy.
+    """
+
+    def __init__(self, max_turns: int = 40, summary_max_chars: int = 600):
+        self.max_turns = max_turns
+        self.summary = RollingSummary(max_chars=summary_max_chars)
+        self.total_turns = 0
+        self._turns: Deque[Turn] = deque(maxlen=max_turns)
+        self._view = RecentTurns(self._turns)
+
+    def append(self, role: str, content: str) -> Turn:
+        """Record a turn, summarizing the oldest one if the buffer is full"""
+        if len(self._turns) == self.max_turns:
+            evicted = self._turns[0]
+            self.summary.add(evicted.role, evicted.content)
+        turn = Turn(role, content, time.time())
+        self._turns.append(turn)
+        self.total_turns += 1
+        return turn
+
+    def recent(self) -> RecentTurns:
+        """Buffered turns, oldest first (a view - it follows later appends)"""
+        return self._view
+
+    def last(self, role: Optional[str] = None) -> Optional[Turn]:
+        """Most recent turn, optionally the most recent one by the given role"""
+        if role is None:
+            return self._turns[-1] if self._turns else None
+        for turn in reversed(self._turns):
+            if turn.role == role:
+                return turn
+        return None
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        """Rolling summary (if any) followed by the buffered turns, as chat messages"""
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Earlier in the conversation: {self.summary.text()}"
+            })
+        messages.extend(turn.to_dict() for turn in self._turns)
+        return messages
+
+    def clear(self):
+        self._turns.clear()
+        self.summary = RollingSummary(max_chars=self.summary.max_chars)
+        self.total_turns = 0
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __bool__(self) -> bool:
+        return bool(self._turns)
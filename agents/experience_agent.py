@@ -3,8 +3,7 @@ Experience Agent - Handles the past experience and projects stage of the intervi
 """
 
 import logging
-from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict
 from livekit import agents, rtc
 from livekit.agents import (
     AutoSubscribe,
@@ -18,6 +17,7 @@ from livekit.agents.voice_assistant import VoiceAssistant
 from livekit.plugins import openai, silero
 
 from .base_agent import BaseInterviewAgent
+from .turn_metrics import TurnTimer
 from .stage_manager import StageManager, InterviewStage
 from .llm_client import LLMClient
 
@@ -34,10 +34,9 @@ class ExperienceAgent(BaseInterviewAgent):
         *args,
         **kwargs
     ):
-        # Load system prompt
-        prompt_path = Path(__file__).parent.parent / "config" / "prompts" / "experience.txt"
-        with open(prompt_path, 'r') as f:
-            system_prompt = f.read()
+        # System prompt from the compiled stage graph (read once per config load)
+        system_prompt = stage_manager.graph.spec(InterviewStage.EXPERIENCE).prompt or ""
+        system_prompt += "\n\nRespond to the candidate's latest message as a technical interviewer. Use STAR method when appropriate. Keep it concise (3-4 sentences max). Ask follow-up questions to dig deeper into technical details."
         
         super().__init__(
             stage=InterviewStage.EXPERIENCE,
@@ -48,14 +47,13 @@ class ExperienceAgent(BaseInterviewAgent):
             **kwargs
         )
         
-        self.max_follow_ups = 5
-        self.conversation_history = []
         self.project_context = {}
     
     async def on_user_speech_committed(self, message: str):
         """Called when user speech is committed"""
         logger.info(f"User said: {message}")
-        self.conversation_history.append({"role": "user", "content": message})
+        turn = self.start_turn()
+        self.record_turn("user", message)
         
         # Extract project/technical context
         self._extract_context(message)
@@ -70,7 +68,7 @@ class ExperienceAgent(BaseInterviewAgent):
             return
         
         # Generate response
-        await self._generate_and_speak(message)
+        await self._generate_and_speak(message, turn=turn)
     
     def _extract_context(self, message: str):
         """Extract technical context from user message"""
@@ -85,45 +83,36 @@ class ExperienceAgent(BaseInterviewAgent):
             if keyword in message_lower:
                 self.project_context[keyword] = self.project_context.get(keyword, 0) + 1
     
-    async def _generate_and_speak(self, user_message: str):
+    def _build_messages(self) -> List[Dict[str, str]]:
+        """Build the chat messages for the next reply"""
+        # System prompt + prior turns form an append-only prefix that the
+        # model server can serve from its prompt cache
+        messages = [{"role": "system", "content": self.system_prompt}]
+        messages.extend(self.context_window.to_messages())
+        
+        # Technical context changes every turn, so it goes after the prefix
+        if self.project_context:
+            messages.append({
+                "role": "system",
+                "content": f"Technical topics mentioned: {', '.join(self.project_context.keys())}"
+            })
+        return messages
+    
+    async def _generate_and_speak(self, user_message: str, turn: Optional[TurnTimer] = None):
         """Generate LLM response and speak it"""
         try:
-            # Build conversation context
-            context = "\n".join([
-                f"{msg['role']}: {msg['content']}"
-                for msg in self.conversation_history[-8:]  # Last 8 messages for more context
-            ])
-            
-            # Add technical context
-            tech_context = ""
-            if self.project_context:
-                tech_context = f"\n\nTechnical topics mentioned: {', '.join(self.project_context.keys())}"
-            
-            prompt = f"""Based on the conversation so far:
-
-{context}{tech_context}
-
-Generate a natural, technical interview response. Use STAR method when appropriate. Keep it concise (3-4 sentences max). Ask follow-up questions to dig deeper into technical details."""
-            
-            # Generate response using Ollama
-            response_text = ""
-            async for chunk in self.llm_client.generate(
-                prompt=prompt,
-                system_prompt=self.system_prompt,
+            # Stream the response to TTS one sentence at a time
+            response_text = await self.speak_stream(self.llm_client.chat(
+                messages=self._build_messages(),
                 temperature=0.6,
                 max_tokens=300,
                 stream=True
-            ):
-                response_text += chunk
+            ), turn=turn)
             
             if response_text.strip():
-                logger.info(f"Agent responding: {response_text[:100]}...")
-                self.conversation_history.append({"role": "assistant", "content": response_text})
+                self.record_turn("assistant", response_text)
                 self.follow_up_count += 1
                 
-                # Speak the response
-                await self.say(response_text, allow_interruptions=True)
-                
                 # Check if response indicates stage completion
                 if any(phrase in response_text.lower() for phrase in [
                     "thank you", "that's great", "wrap up", "conclude"
@@ -140,11 +129,11 @@ Generate a natural, technical interview response. Use STAR method when appropria
         
         # Wait for stage to be EXPERIENCE
         current_stage = await self.stage_manager.get_current_stage()
-        if current_stage == InterviewStage.EXPERIENCE:
+        greeting = self.stage_manager.graph.spec(self.stage).opening_line
+        if current_stage == self.stage and greeting:
             # Start with experience question
-            greeting = "Let's dive into your past experience. Can you tell me about a project you're particularly proud of? What was your role, and what challenges did you face?"
             await self.say(greeting, allow_interruptions=True)
-            self.conversation_history.append({"role": "assistant", "content": greeting})
+            self.record_turn("assistant", greeting)
 
 
 async def entrypoint(ctx: JobContext):
@@ -167,7 +156,7 @@ async def entrypoint(ctx: JobContext):
     await stage_manager.initialize(ctx.room.sid)
     
     # Initialize LLM client
-    llm_client = LLMClient()
+    llm_client = LLMClient(redis_client=redis_client)
     
     # Create agent
     agent = ExperienceAgent(
@@ -5,60 +5,158 @@ Uses LiveKit Agents SDK v1.3+ with AgentServer and AgentSession
 
 import logging
 import asyncio
-from pathlib import Path
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional
 from livekit import agents, rtc
 from livekit.agents import AgentServer, WorkerOptions
+from livekit.agents.llm import ChatContext
 from livekit.agents.voice import Agent, AgentSession
-from livekit.plugins import silero
 from livekit.plugins.openai import STT, TTS
-import yaml
 
-from agents.stage_manager import StageManager, InterviewStage
-from livekit.plugins.openai import LLM as OpenAILLM
+from agents.stage_manager import StageManager
+from agents.audio_cache import AudioFrameCache, say_cached
+from agents.conversation_history import ConversationHistory
+from agents.speculative import InterimDrafts
+from agents.transcript_buffer import TranscriptBuffer
+from agents.load_monitor import LoadMonitor, start_loop_lag_probe
+from agents.metrics_server import enable_multiprocess_metrics, start_metrics_server
+from agents.turn_metrics import SessionTurnTracker
+from agents.config import get_settings
+from agents.worker_resources import prewarm, get_worker_resources
 
 logger = logging.getLogger(__name__)
 
+BASE_INSTRUCTIONS = """You are a professional interview assistant conducting a mock interview.
+            You are friendly, professional, and help candidates practice their interview skills.
+            Your responses are concise, natural, and conversational.
+            You ask follow-up questions to understand the candidate better.
+            You transition smoothly between interview stages."""
+
 
 class InterviewAssistant(Agent):
     """Interview agent that conducts mock interviews"""
     
     def __init__(self, stage_manager: StageManager):
-        super().__init__(
-            instructions="""You are a professional interview assistant conducting a mock interview.
-            You are friendly, professional, and help candidates practice their interview skills.
-            Your responses are concise, natural, and conversational.
-            You ask follow-up questions to understand the candidate better.
-            You transition smoothly between interview stages."""
-        )
+        super().__init__(instructions=BASE_INSTRUCTIONS)
         self.stage_manager = stage_manager
-        self.conversation_history = []
+        # Bounded history the prompt is built from; the agent's own chat
+        # context is trimmed to the same number of turns as it grows
+        history_config = stage_manager.config.get("conversation", {})
+        self.conversation_history = ConversationHistory(
+            max_turns=history_config.get("max_turns", 40),
+            summary_max_chars=history_config.get("summary_max_chars", 600)
+        )
         self.follow_up_count = 0
         self.room_id = None
+        self.transcript: Optional[TranscriptBuffer] = None
+        self.audio_cache: Optional[AudioFrameCache] = None
+        # Replies drafted from interim transcripts (stages opt in via settings.yaml)
+        self.interim_drafts = InterimDrafts(stage_manager.get_stage, stage_manager.config, self._draft_reply)
+
+    def record_turn(self, role: str, content: str):
+        """Record a turn in the bounded history and the Redis transcript"""
+        self.conversation_history.append(role, content)
+        self.save_to_transcript(role, content)
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message):
+        """Called with the candidate's final transcript, before the reply is generated"""
+        text = new_message.text_content
+        if text:
+            logger.info(f"👤 User said: {text}")
+            self.record_turn("user", text)
+        await self.trim_chat_ctx()
 
-    async def save_to_transcript(self, role: str, content: str):
-        """Save message to Redis transcript"""
+    async def trim_chat_ctx(self):
+        """Cap the agent's chat context at the history's size (older turns live on in its summary)"""
+        max_items = self.conversation_history.max_turns
+        if len(self.chat_ctx.items) <= max_items + 1:
+            return
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.truncate(max_items=max_items)
+        await self.update_chat_ctx(chat_ctx)
+
+    def on_conversation_item_added(self, event):
+        """Session event handler: record what the agent said (replies and stage lines)"""
+        item = event.item
+        if getattr(item, "role", None) == "assistant" and item.text_content:
+            logger.info(f"🤖 Agent said: {item.text_content}")
+            self.record_turn("assistant", item.text_content)
+
+    def _bounded_chat_ctx(self, chat_ctx: ChatContext) -> ChatContext:
+        """The context's instructions followed by the bounded history, instead of every turn"""
+        bounded = ChatContext.empty()
+        for item in chat_ctx.items:
+            if getattr(item, "type", None) == "message" and item.role in ("system", "developer"):
+                bounded.items.append(item)
+        for message in self.conversation_history.to_messages():
+            bounded.add_message(role=message["role"], content=message["content"])
+        return bounded
+
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        """Reply with the speculative draft if the final transcript still matches it, else run the LLM"""
+        draft = self.interim_drafts.take(_last_user_text(chat_ctx))
+        if draft:
+            logger.info("⚡ Streaming speculative draft")
+            async for chunk in draft:
+                yield chunk
+            if draft.chunks:
+                return
+            # The draft failed or came back empty before producing anything
+        chat_ctx = self._bounded_chat_ctx(chat_ctx)
+        async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+            yield chunk
+
+    async def _draft_reply(self, interim_text: str) -> AsyncIterator[str]:
+        """Stream a reply to an interim transcript from the session's LLM"""
+        chat_ctx = self._bounded_chat_ctx(self.chat_ctx)
+        chat_ctx.add_message(role="user", content=interim_text)
+        async with self.session.llm.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    yield chunk.delta.content
+
+    def save_to_transcript(self, role: str, content: str):
+        """Queue message for the Redis transcript (written behind, never blocks on Redis)"""
         if not self.stage_manager.redis_client or not self.room_id:
             return
         
-        try:
-            import json
-            from datetime import datetime
-            message = {
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            }
-            transcript_key = f"interview:{self.room_id}:transcript"
-            await self.stage_manager.redis_client.rpush(transcript_key, json.dumps(message))
-            await self.stage_manager.redis_client.expire(transcript_key, 86400)  # 24 hours
-        except Exception as e:
-            logger.error(f"Error saving to transcript: {e}")
+        if self.transcript is None:
+            transcript_config = self.stage_manager.config.get("transcript", {})
+            self.transcript = TranscriptBuffer(
+                self.stage_manager.redis_client,
+                self.room_id,
+                flush_interval=transcript_config.get("flush_interval_seconds", 0.5),
+                max_batch=transcript_config.get("max_batch", 20),
+                max_pending=transcript_config.get("max_pending", 500),
+                ttl_seconds=transcript_config.get("ttl_seconds", 86400)
+            )
+        self.transcript.add(role, content)
+    
+    async def close_transcript(self):
+        """Flush any buffered transcript entries"""
+        if self.transcript:
+            await self.transcript.aclose()
+
+
+def _last_user_text(chat_ctx) -> str:
+    """Text of the most recent user message in a chat context"""
+    for item in reversed(chat_ctx.items):
+        if getattr(item, "type", None) == "message" and item.role == "user":
+            return item.text_content or ""
+    return ""
+
 
+# Report real load (sessions, CPU) so LiveKit dispatches new jobs
+# to less loaded workers once this one is past its load threshold
+worker_config = get_settings().section("worker")
+load_monitor = LoadMonitor.from_config(get_settings())
+load_threshold = worker_config.get("load_threshold", 0.8)
 
 # Create AgentServer instance
 # agent_name is set via LIVEKIT_AGENT_NAME environment variable in docker-compose.yml
-server = AgentServer()
+server = AgentServer(load_fnc=load_monitor, load_threshold=load_threshold)
+# Load VAD, config and shared clients once per worker process, not per job
+server.setup_fnc = prewarm
 
 
 @server.rtc_session()
@@ -71,67 +169,40 @@ async def interview_agent(ctx: agents.JobContext):
         logger.error(f"❌ Error getting room SID: {e}", exc_info=True)
         raise
     
-    # Load configuration
-    config_path = Path(__file__).parent.parent / "config" / "settings.yaml"
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    job_start = time.perf_counter()
+    timings = {}
     
-    # Connect to Redis - use environment variables directly
-    import redis.asyncio as redis
-    import os
+    # Sessions run in this job process, so its event loop is the one to watch
+    start_loop_lag_probe()
     
-    # Get from environment (set by docker-compose) or use defaults
-    redis_host = os.getenv("REDIS_HOST", "redis")
-    redis_port = int(os.getenv("REDIS_PORT", "6379"))
-    redis_db = int(os.getenv("REDIS_DB", "0"))
-    redis_password = os.getenv("REDIS_PASSWORD", "")
+    # Shared per-process resources (loaded by the prewarm hook)
+    start = time.perf_counter()
+    resources = get_worker_resources(ctx)
+    timings["resources"] = time.perf_counter() - start
     
-    if redis_password:
-        redis_url = f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
-    else:
-        redis_url = f"redis://{redis_host}:{redis_port}/{redis_db}"
-    
-    redis_client = redis.from_url(redis_url, decode_responses=True)
+    if resources.llm is None:
+        raise ValueError("OPENAI_API_KEY is required! Add it to .env file")
     
-    # Initialize stage manager
+    # Initialize stage manager on the shared Redis pool and parsed config
+    start = time.perf_counter()
     room_sid = ctx.room.sid  # sid is a property, not a method
-    stage_manager = StageManager(redis_client=redis_client, config_path=config_path)
+    stage_manager = StageManager(redis_client=resources.redis_client, config=resources.config)
     await stage_manager.initialize(room_sid)
+    await stage_manager.start_listening()
+    timings["stage_manager"] = time.perf_counter() - start
     
-    # Initialize OpenAI LLM (much better than Ollama - no networking issues!)
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        raise ValueError("OPENAI_API_KEY is required! Add it to .env file")
-    
-    # Use OpenAI GPT-4 or GPT-3.5-turbo for conversation
-    llm_config = config.get("llm", {})
-    openai_llm = OpenAILLM(
-        model=llm_config.get("model", "gpt-4o-mini"),  # Fast and cheap, or use "gpt-4o" for better quality
-    )
-    logger.info(f"✅ Using OpenAI LLM: {llm_config.get('model', 'gpt-4o-mini')}")
+    # OpenAI LLM is shared by every session in this process
+    openai_llm = resources.llm
+    logger.info(f"✅ Using OpenAI LLM: {resources.config.get('llm', {}).get('model', 'gpt-4o-mini')}")
     
     # Create assistant agent with proactive instructions
     assistant = InterviewAssistant(stage_manager)
     assistant.room_id = room_sid
+    assistant.audio_cache = resources.audio_cache
     
     # Note: We'll trigger greeting in the stage loop instead of using event handlers
     # Event handlers on ctx.room need to be set up after session.start()
     
-    # Set up event handlers to capture conversation
-    async def on_user_speech(text: str):
-        """Capture user speech"""
-        if text:
-            logger.info(f"👤 User said: {text}")
-            assistant.conversation_history.append({"role": "user", "content": text})
-            await assistant.save_to_transcript("user", text)
-    
-    async def on_agent_speech(text: str):
-        """Capture agent speech"""
-        if text:
-            logger.info(f"🤖 Agent said: {text}")
-            assistant.conversation_history.append({"role": "assistant", "content": text})
-            await assistant.save_to_transcript("assistant", text)
-    
     # Create AgentSession with Ollama LLM
     # IMPORTANT: STT and TTS are REQUIRED for voice interaction!
     # Without STT: Agent cannot hear/transcribe your speech
@@ -143,24 +214,44 @@ async def interview_agent(ctx: agents.JobContext):
     
     # Use OpenAI for everything: STT, LLM, and TTS
     logger.info("✅ Using OpenAI for STT, LLM, and TTS")
+    tts = TTS()  # OpenAI TTS - speaks responses
     session = AgentSession(
-        vad=silero.VAD.load(),
+        vad=resources.vad,  # Loaded once per process in prewarm()
         stt=STT(),  # OpenAI STT - transcribes your speech
         llm=openai_llm,  # OpenAI LLM - generates responses
-        tts=TTS(),  # OpenAI TTS - speaks responses
+        tts=tts,
         allow_interruptions=True,
     )
     
+    # Per-turn latency (end of speech -> STT -> LLM -> TTS -> playout), by stage
+    SessionTurnTracker(session, stage_manager.get_stage, sink=resources.turn_latency).attach()
+    
+    # Capture the agent's side of the conversation (the user's comes in on_user_turn_completed)
+    session.on("conversation_item_added", assistant.on_conversation_item_added)
+    
+    # Start drafting replies from interim STT transcripts
+    assistant.interim_drafts.attach(session)
+    
+    # Synthesize any stage opening lines this voice has not cached yet (runs
+    # while the session connects; cached ones are played without TTS)
+    asyncio.create_task(resources.audio_cache.warm(tts, stage_manager.graph.opening_lines))
+    
     try:
         logger.info("📡 Starting AgentSession...")
         logger.info(f"🔗 Connecting to room: {ctx.room.name} (SID: {ctx.room.sid})")
         
+        start = time.perf_counter()
         await session.start(
             room=ctx.room,
             agent=assistant,
         )
+        timings["session_start"] = time.perf_counter() - start
         
         logger.info("✅ AgentSession started successfully")
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+        logger.info(
+            f"⏱️  Job ready in {(time.perf_counter() - job_start) * 1000:.0f}ms ({breakdown})"
+        )
         
         # Verify agent is in the room
         participants = ctx.room.remote_participants
@@ -212,11 +303,7 @@ async def interview_agent(ctx: agents.JobContext):
     
     # Wait for interview to complete
     try:
-        while True:
-            current_stage = await stage_manager.get_current_stage()
-            if current_stage == InterviewStage.END:
-                break
-            await asyncio.sleep(1)
+        await stage_manager.wait_for_stage(stage_manager.graph.terminal)
     except KeyboardInterrupt:
         logger.info("Agent interrupted")
     finally:
@@ -225,113 +312,91 @@ async def interview_agent(ctx: agents.JobContext):
             logger.info("Agent session closed")
         except Exception as e:
             logger.error(f"Error closing agent session: {e}")
+        assistant.interim_drafts.cancel()
+        await assistant.close_transcript()
+        await resources.turn_latency.flush()
+        await stage_manager.close()
 
 
 async def run_stage_loop(session: AgentSession, stage_manager: StageManager, assistant: InterviewAssistant):
     """Event loop for handling stages and transitions"""
     await asyncio.sleep(3)  # Wait for connection to stabilize and user to potentially join
+    graph = stage_manager.graph
     
-    # Always start the interview - transition to self_intro if still in start stage
+    # Always start the interview - leave the initial (waiting) stage first
     current_stage = stage_manager.get_stage()
     logger.info(f"📊 Current stage: {current_stage}")
     
-    # If still in start stage, transition to self_intro first
-    if current_stage == InterviewStage.START.value or current_stage == "start":
-        logger.info("🔄 Transitioning from start to self_intro...")
+    if current_stage == graph.initial:
+        logger.info(f"🔄 Transitioning from {graph.initial} to {graph.next_of(graph.initial)}...")
         await stage_manager.transition_to_next()
-        current_stage = stage_manager.get_stage()
-        logger.info(f"📊 New stage: {current_stage}")
-    
-    # Now start the interview
-    if current_stage == InterviewStage.SELF_INTRO.value or current_stage == "self_intro":
-        logger.info("🚀 Starting interview - sending greeting...")
-        await handle_self_intro(session, stage_manager, assistant)
+        logger.info(f"📊 New stage: {stage_manager.get_stage()}")
     
+    # Each stage is opened once, in whatever order the pipeline reaches them
+    opened = set()
     while True:
         try:
+            # Read the version first so a change during handling is not missed
+            version = stage_manager.stage_version
             current_stage = stage_manager.get_stage()
-            if current_stage == InterviewStage.EXPERIENCE.value:
-                await handle_experience(session, stage_manager, assistant)
-            elif current_stage == InterviewStage.END.value:
-                try:
-                    await session.say("Thank you! The interview is complete.", allow_interruptions=True)
-                except Exception as e:
-                    logger.warning(f"Could not send final message: {e}")
+            if current_stage not in opened:
+                opened.add(current_stage)
+                await enter_stage(session, stage_manager, assistant, current_stage)
+            if graph.is_terminal(current_stage):
                 break
-            await asyncio.sleep(0.5)
+            await stage_manager.wait_for_change(version)
         except Exception as e:
             # Don't exit on errors, just log and continue
             logger.error(f"Error in stage loop: {e}", exc_info=True)
             await asyncio.sleep(1)
 
 
-async def handle_self_intro(session: AgentSession, stage_manager: StageManager, assistant: InterviewAssistant):
-    """Handle self-introduction stage"""
-    if not stage_manager.flag_intro_start:
-        stage_manager.flag_intro_start = True
-        greeting = "Hello! I'm conducting your interview today. To start, could you tell me a bit about yourself - your background, what you're passionate about, and what brings you here today?"
-        logger.info(f"🎤 Attempting to send greeting: {greeting[:50]}...")
+async def enter_stage(session: AgentSession, stage_manager: StageManager, assistant: InterviewAssistant, stage: str):
+    """Switch the agent to a stage's prompt and speak its opening line"""
+    spec = stage_manager.graph.spec(stage)
+    
+    if spec.prompt:
         try:
-            # Use say() to make the agent speak proactively
-            logger.info("Calling session.say()...")
-            # session.say() returns a SpeechHandle - we can await it or just call it
-            speech_handle = await session.say(greeting, allow_interruptions=True)
-            logger.info(f"✅ session.say() returned: {type(speech_handle)}")
-            # Wait a bit for speech to start
-            await asyncio.sleep(0.5)
-            logger.info(f"✅ Agent said greeting successfully!")
+            await assistant.update_instructions(f"{BASE_INSTRUCTIONS}\n\n{spec.prompt}")
         except Exception as e:
-            logger.error(f"❌ Error with session.say(): {e}", exc_info=True, stack_info=True)
-            # Fallback: try generate_reply - this should work for proactive speech
-            try:
-                logger.info("Trying fallback: generate_reply()...")
-                # generate_reply needs user_input - but we can pass the greeting as if user said it
-                await session.generate_reply(user_input=greeting)
-                logger.info("✅ Fallback generate_reply() succeeded")
-            except Exception as e2:
-                logger.error(f"❌ Fallback also failed: {e2}", exc_info=True)
-        await assistant.save_to_transcript("assistant", greeting)
-        logger.info("✅ Self-intro stage started")
-        
-        stage_config = stage_manager.config.get("stages", {}).get("self_intro", {})
-        fallback_timeout = stage_config.get("fallback_timeout_seconds", 45)
-        await asyncio.sleep(fallback_timeout)
-        
-        if stage_manager.get_stage() == InterviewStage.SELF_INTRO.value:
-            logger.info(f"Self-intro fallback timer triggered after {fallback_timeout}s")
-            await stage_manager.transition_to_next()
-
-
-async def handle_experience(session: AgentSession, stage_manager: StageManager, assistant: InterviewAssistant):
-    """Handle experience stage"""
-    if not stage_manager.flag_exp_start:
-        stage_manager.flag_exp_start = True
-        transition_msg = "Let's dive into your past experience. Can you tell me about a project you're particularly proud of? What was your role, and what challenges did you face?"
+            logger.warning(f"Could not apply {stage} instructions: {e}")
+    
+    if spec.opening_line:
+        logger.info(f"🎤 Opening {stage}: {spec.opening_line[:50]}...")
         try:
-            await session.say(transition_msg, allow_interruptions=True)
-            logger.info(f"✅ Agent said transition: {transition_msg[:50]}...")
+            # Played from the pre-synthesized audio cache when available
+            await say_cached(session, spec.opening_line, assistant.audio_cache)
         except Exception as e:
-            logger.error(f"❌ Error sending transition: {e}")
-            try:
-                await session.generate_reply(user_input=transition_msg)
-            except:
-                pass
-        await assistant.save_to_transcript("assistant", transition_msg)
-        logger.info("Experience stage started")
-        
-        stage_config = stage_manager.config.get("stages", {}).get("experience", {})
-        fallback_timeout = stage_config.get("fallback_timeout_seconds", 120)
-        await asyncio.sleep(fallback_timeout)
-        
-        if stage_manager.get_stage() == InterviewStage.EXPERIENCE.value:
-            logger.info(f"Experience fallback timer triggered after {fallback_timeout}s")
-            await stage_manager.transition_to_next()
+            logger.error(f"❌ Error with session.say(): {e}", exc_info=True)
+            if not spec.terminal:
+                # Fallback: generate_reply - this should work for proactive speech
+                try:
+                    await session.generate_reply(user_input=spec.opening_line)
+                except Exception as e2:
+                    logger.error(f"❌ Fallback also failed: {e2}", exc_info=True)
+    
+    # The stage's fallback timeout is owned by the StageManager's timer
+    logger.info(f"✅ {spec.name} stage started")
 
 
 if __name__ == "__main__":
+    # One metrics endpoint for the worker: job processes write to the
+    # multiprocess directory, this process serves them along with its load
+    metrics_config = get_settings().section("metrics")
+    if metrics_config.get("enabled", True):
+        enable_multiprocess_metrics(metrics_config.get("multiproc_dir", "/tmp/interview-agent-metrics"))
+        start_metrics_server(
+            host=metrics_config.get("host", "0.0.0.0"),
+            port=metrics_config.get("port", 9100),
+            collector=load_monitor
+        )
+    
     # Use WorkerOptions to set agent_name - this is what LiveKit uses for dispatch
     # The entrypoint is the @server.rtc_session() decorated function
     agents.cli.run_app(WorkerOptions(
         entrypoint_fnc=interview_agent,
+        prewarm_fnc=prewarm,
+        load_fnc=load_monitor,
+        load_threshold=load_threshold,
         agent_name="interview-agent"
     ))
@@ -2,19 +2,140 @@
 LLM Client - Handles Ollama and other LLM provider integrations
 """
 
+import asyncio
+import json
 import logging
-from typing import Optional, AsyncGenerator
+import time
+from typing import Optional, AsyncGenerator, Dict, Tuple, List, Sequence
 import httpx
-import yaml
 from pathlib import Path
+import redis.asyncio as redis
+from livekit.agents import get_job_context
+from prometheus_client import Counter
+
+from .config import get_settings
+from .batch import BatchItem, BatchResult, summarize_batch
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from .resilience import (
+    CircuitOpenError,
+    LLM_RETRIES,
+    LLM_RETRY_BUDGET_EXHAUSTED,
+    backoff_delay,
+    get_circuit_breaker,
+    get_retry_budget,
+    is_retryable,
+    resilience_stats,
+)
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional ``h2`` package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+FALLBACK_RESPONSE = "I apologize, but I'm experiencing some technical difficulties. Could you please repeat that?"
+
+# Process-wide connection pools, keyed by (base_url, timeout, limits, http2), so
+# every LLMClient in a worker reuses the same keep-alive connections.
+_http_clients: Dict[Tuple, httpx.AsyncClient] = {}
+# Whether closing the pools is registered on the running job's shutdown
+_shutdown_registered = False
+
+# Ollama prefill/decode accounting (from the timings in the final response)
+LLM_PROMPT_EVAL_TOKENS = Counter(
+    "llm_prompt_eval_tokens_total", "Prompt tokens evaluated (not served from the KV cache)", ("model",)
+)
+LLM_PROMPT_EVAL_SECONDS = Counter(
+    "llm_prompt_eval_seconds_total", "Time spent on prompt evaluation (prefill)", ("model",)
+)
+LLM_EVAL_TOKENS = Counter(
+    "llm_eval_tokens_total", "Tokens generated", ("model",)
+)
+LLM_EVAL_SECONDS = Counter(
+    "llm_eval_seconds_total", "Time spent generating tokens (decode)", ("model",)
+)
+
+# Process-wide in-flight request registry shared by every LLMClient
+_single_flight = SingleFlight()
+
+
+def _get_shared_http_client(
+    base_url: str,
+    timeout: float,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    http2: bool
+) -> httpx.AsyncClient:
+    """Get (or lazily create) the pooled HTTP client for this process"""
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+        http2 = False
+    
+    key = (base_url, timeout, max_connections, max_keepalive_connections, keepalive_expiry, http2)
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            http2=http2
+        )
+        _http_clients[key] = client
+        _close_on_job_shutdown()
+        logger.info(
+            f"Created pooled HTTP client for {base_url} "
+            f"(max_connections={max_connections}, keepalive={max_keepalive_connections}, http2={http2})"
+        )
+    return client
+
+
+def _close_on_job_shutdown():
+    """
+    Close the pools when the job shuts down. Each job runs in its own process,
+    so that is the end of the process; outside a job (scripts, tests) call
+    close_shared_http_clients() directly.
+    """
+    global _shutdown_registered
+    if _shutdown_registered:
+        return
+    try:
+        ctx = get_job_context()
+    except RuntimeError:
+        return  # not running inside a job
+    ctx.add_shutdown_callback(close_shared_http_clients)
+    _shutdown_registered = True
+
+
+async def close_shared_http_clients():
+    """Close every pooled HTTP client in this process (runs on job shutdown)"""
+    global _shutdown_registered
+    _shutdown_registered = False
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing HTTP client: {e}")
+
 
 class LLMClient:
     """Client for interacting with LLM providers (Ollama, OpenAI, etc.)"""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        redis_client: Optional[redis.Redis] = None
+    ):
         self.config = self._load_config(config_path)
         self.llm_config = self.config.get("llm", {})
         self.provider = self.llm_config.get("provider", "ollama")
@@ -22,16 +143,70 @@ class LLMClient:
         self.base_url = self.llm_config.get("base_url", "http://localhost:11434")
         self.timeout = self.llm_config.get("timeout", 30)
         self.max_retries = self.llm_config.get("max_retries", 3)
+        # Keep the model (and its prompt cache) resident between turns
+        self.keep_alive = self.llm_config.get("keep_alive", "30m")
+        self.last_timings: Dict[str, float] = {}
         
-    def _load_config(self, config_path: Optional[Path]) -> dict:
-        """Load configuration from YAML file"""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "settings.yaml"
+        pool_config = self.llm_config.get("http_pool", {})
+        self.max_connections = pool_config.get("max_connections", 100)
+        self.max_keepalive_connections = pool_config.get("max_keepalive_connections", 20)
+        self.keepalive_expiry = pool_config.get("keepalive_expiry", 30.0)
+        self.http2 = pool_config.get("http2", False)
+        
+        # Optional response cache (LRU + TTL, with a shared Redis tier)
+        cache_config = self.llm_config.get("cache", {})
+        self.cache_enabled = cache_config.get("enabled", False)
+        self.cache_max_temperature = cache_config.get("max_temperature", 0.0)
+        self.cache: Optional[ResponseCache] = None
+        if self.cache_enabled:
+            self.cache = ResponseCache(
+                max_entries=cache_config.get("max_entries", 1024),
+                ttl_seconds=cache_config.get("ttl_seconds", 3600),
+                redis_client=redis_client if cache_config.get("redis", False) else None
+            )
+        
+        # Share one upstream call between identical concurrent requests
+        self.coalesce_requests = self.llm_config.get("coalesce_requests", True)
         
+        # Defaults for generate_many()
+        batch_config = self.llm_config.get("batch", {})
+        self.batch_concurrency = batch_config.get("concurrency", 4)
+        self.batch_item_timeout = batch_config.get("item_timeout", 60)
+        
+        # Retry with jittered backoff, bounded by a per-endpoint retry budget
+        retry_config = self.llm_config.get("retry", {})
+        self.retry_base_delay = retry_config.get("base_delay", 0.2)
+        self.retry_max_delay = retry_config.get("max_delay", 2.0)
+        self.retry_budget = get_retry_budget(
+            self.base_url,
+            ratio=retry_config.get("budget_ratio", 0.2),
+            min_per_second=retry_config.get("min_retries_per_second", 1.0)
+        )
+        
+        # Fail fast while the model server is saturated
+        breaker_config = self.llm_config.get("circuit_breaker", {})
+        self.circuit_breaker = get_circuit_breaker(
+            self.base_url,
+            failure_threshold=breaker_config.get("failure_threshold", 5),
+            recovery_timeout=breaker_config.get("recovery_timeout", 10.0)
+        )
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared, pooled HTTP client for the configured endpoint"""
+        return _get_shared_http_client(
+            self.base_url,
+            self.timeout,
+            self.max_connections,
+            self.max_keepalive_connections,
+            self.keepalive_expiry,
+            self.http2
+        )
+    
+    def _load_config(self, config_path: Optional[Path]) -> dict:
+        """Get the process-wide settings snapshot (parsed once, not per instance)"""
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            return get_settings(config_path)
         except Exception as e:
             logger.warning(f"Failed to load config: {e}, using defaults")
             return {}
@@ -42,89 +217,342 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 500,
-        stream: bool = False
+        stream: bool = False,
+        use_cache: Optional[bool] = None
     ) -> AsyncGenerator[str, None]:
-        """Generate response from LLM"""
-        if self.provider == "ollama":
-            async for chunk in self._generate_ollama(
-                prompt, system_prompt, temperature, max_tokens, stream
+        """Generate response from LLM for a single prompt"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        async for chunk in self.chat(messages, temperature, max_tokens, stream, use_cache):
+            yield chunk
+    
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        stream: bool = False,
+        use_cache: Optional[bool] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate response from LLM for a list of chat messages.
+        
+        Callers should keep the system prompt and prior turns as a stable,
+        append-only prefix so Ollama can reuse its KV cache across turns.
+        
+        When the cache is enabled, deterministic calls (temperature at or below
+        llm.cache.max_temperature) are served from it; pass use_cache=True to
+        force caching (e.g. evaluation passes) or False to bypass it.
+        """
+        if self.provider != "ollama":
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        
+        try:
+            async for chunk in self._chat_stream(
+                messages, temperature, max_tokens, stream, use_cache
             ):
                 yield chunk
+        except CircuitOpenError as e:
+            logger.error(f"Ollama request rejected: {e}")
+            yield FALLBACK_RESPONSE
+        except httpx.TimeoutException:
+            logger.error(f"Ollama request timeout after {self.timeout}s")
+            yield FALLBACK_RESPONSE
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ollama HTTP error: {e}")
+            yield FALLBACK_RESPONSE
+        except Exception as e:
+            logger.error(f"Ollama error: {e}")
+            yield FALLBACK_RESPONSE
+    
+    async def _chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+        use_cache: Optional[bool]
+    ) -> AsyncGenerator[str, None]:
+        """Cache -> single-flight -> retrying upstream call (raises on failure)"""
+        system_prompt = None
+        conversation = messages
+        if messages and messages[0]["role"] == "system":
+            system_prompt = messages[0]["content"]
+            conversation = messages[1:]
+        request_key = ResponseCache.make_key(
+            self.model, system_prompt, json.dumps(conversation), temperature, max_tokens
+        )
+        
+        cache_key = None
+        if self._should_cache(temperature, use_cache):
+            cache_key = request_key
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        def upstream():
+            return self._generate_with_retry(messages, temperature, max_tokens, stream)
+        
+        if self.coalesce_requests:
+            chunks = _single_flight.stream(f"{self.base_url}:{request_key}", upstream)
         else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+            chunks = upstream()
+        
+        response_text = ""
+        async for chunk in chunks:
+            response_text += chunk
+            yield chunk
+        
+        if cache_key and response_text:
+            await self.cache.set(cache_key, response_text)
     
-    async def _generate_ollama(
+    def _should_cache(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """Decide whether a call goes through the response cache"""
+        if self.cache is None or use_cache is False:
+            return False
+        if use_cache:
+            return True
+        return temperature <= self.cache_max_temperature
+    
+    def cache_stats(self) -> dict:
+        """Response cache hit/miss counters"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+    
+    def coalescing_stats(self) -> dict:
+        """Single-flight counters (shared by all clients in this process)"""
+        return _single_flight.stats()
+    
+    def resilience_stats(self) -> dict:
+        """Circuit breaker state and retry counters for this endpoint"""
+        return resilience_stats(self.base_url)
+    
+    async def _generate_with_retry(
         self,
-        prompt: str,
-        system_prompt: Optional[str],
+        messages: List[Dict[str, str]],
         temperature: float,
         max_tokens: int,
         stream: bool
     ) -> AsyncGenerator[str, None]:
-        """Generate response using Ollama"""
-        url = f"{self.base_url}/api/chat"
+        """
+        Call Ollama, retrying retryable errors with jittered exponential backoff.
+        A stream is only retried if it failed before producing any output.
+        """
+        self.retry_budget.record_request()
+        attempt = 0
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit open for {self.base_url}")
+            
+            produced_output = False
+            try:
+                async for chunk in self._generate_ollama(
+                    messages, temperature, max_tokens, stream
+                ):
+                    produced_output = True
+                    yield chunk
+                self.circuit_breaker.record_success()
+                return
+            except Exception as e:
+                if not is_retryable(e):
+                    # The server answered; the request itself was bad
+                    self.circuit_breaker.record_success()
+                    raise
+                
+                self.circuit_breaker.record_failure()
+                if produced_output or attempt >= self.max_retries:
+                    raise
+                if not self.retry_budget.try_spend():
+                    LLM_RETRY_BUDGET_EXHAUSTED.labels(endpoint=self.base_url).inc()
+                    raise
+                
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                attempt += 1
+                LLM_RETRIES.labels(endpoint=self.base_url).inc()
+                logger.warning(
+                    f"Ollama request failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+    
+    async def _generate_ollama(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> AsyncGenerator[str, None]:
+        """Generate response using Ollama (raises on transport/HTTP errors)"""
+        url = "/api/chat"
         
         payload = {
             "model": self.model,
             "messages": messages,
             "stream": stream,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens
             }
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                if stream:
-                    async with client.stream("POST", url, json=payload) as response:
-                        response.raise_for_status()
-                        async for line in response.aiter_lines():
-                            if line:
-                                try:
-                                    import json
-                                    data = json.loads(line)
-                                    if "message" in data and "content" in data["message"]:
-                                        content = data["message"]["content"]
-                                        if content:
-                                            yield content
-                                    if data.get("done", False):
-                                        break
-                                except json.JSONDecodeError:
-                                    continue
-                else:
-                    response = await client.post(url, json=payload)
-                    response.raise_for_status()
-                    data = response.json()
-                    if "message" in data and "content" in data["message"]:
-                        yield data["message"]["content"]
-            except httpx.TimeoutException:
-                logger.error(f"Ollama request timeout after {self.timeout}s")
-                yield "I apologize, but I'm experiencing some technical difficulties. Could you please repeat that?"
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Ollama HTTP error: {e}")
-                yield "I apologize, but I'm experiencing some technical difficulties. Could you please repeat that?"
-            except Exception as e:
-                logger.error(f"Ollama error: {e}")
-                yield "I apologize, but I'm experiencing some technical difficulties. Could you please repeat that?"
+        client = self.http_client
+        if stream:
+            async with client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            if "message" in data and "content" in data["message"]:
+                                content = data["message"]["content"]
+                                if content:
+                                    yield content
+                            if data.get("done", False):
+                                self._record_timings(data)
+                                break
+                        except json.JSONDecodeError:
+                            continue
+        else:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            self._record_timings(data)
+            if "message" in data and "content" in data["message"]:
+                yield data["message"]["content"]
+    
+    def _record_timings(self, data: dict):
+        """Record Ollama's prompt-eval (prefill) vs. eval (decode) timings"""
+        # Ollama reports durations in nanoseconds
+        timings = {
+            "prompt_eval_count": data.get("prompt_eval_count", 0),
+            "prompt_eval_seconds": data.get("prompt_eval_duration", 0) / 1e9,
+            "eval_count": data.get("eval_count", 0),
+            "eval_seconds": data.get("eval_duration", 0) / 1e9,
+            "load_seconds": data.get("load_duration", 0) / 1e9,
+            "total_seconds": data.get("total_duration", 0) / 1e9,
+        }
+        self.last_timings = timings
+        LLM_PROMPT_EVAL_TOKENS.labels(model=self.model).inc(timings["prompt_eval_count"])
+        LLM_PROMPT_EVAL_SECONDS.labels(model=self.model).inc(timings["prompt_eval_seconds"])
+        LLM_EVAL_TOKENS.labels(model=self.model).inc(timings["eval_count"])
+        LLM_EVAL_SECONDS.labels(model=self.model).inc(timings["eval_seconds"])
+        logger.debug(
+            f"Ollama timings: prefill {timings['prompt_eval_count']} tokens in "
+            f"{timings['prompt_eval_seconds']:.3f}s, decode {timings['eval_count']} tokens in "
+            f"{timings['eval_seconds']:.3f}s"
+        )
     
     async def generate_complete(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 500
+        max_tokens: int = 500,
+        use_cache: Optional[bool] = None
     ) -> str:
         """Generate complete response (non-streaming)"""
         full_response = ""
         async for chunk in self.generate(
-            prompt, system_prompt, temperature, max_tokens, stream=False
+            prompt, system_prompt, temperature, max_tokens, stream=False, use_cache=use_cache
         ):
             full_response += chunk
         return full_response
-
+    
+    async def generate_many(
+        self,
+        prompts: Sequence[str],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        use_cache: Optional[bool] = None
+    ) -> BatchResult:
+        """
+        Generate responses for many prompts with bounded concurrency.
+        Results are returned in prompt order together with aggregate stats;
+        failed or timed-out items carry an error instead of raising.
+        """
+        start = time.monotonic()
+        items: List[Optional[BatchItem]] = [None] * len(prompts)
+        async for item in self.iter_generate_many(
+            prompts, system_prompt, temperature, max_tokens,
+            concurrency=concurrency, item_timeout=item_timeout,
+            ordered=False, use_cache=use_cache
+        ):
+            items[item.index] = item
+        return BatchResult(items=items, stats=summarize_batch(items, time.monotonic() - start))
+    
+    async def iter_generate_many(
+        self,
+        prompts: Sequence[str],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        ordered: bool = True,
+        use_cache: Optional[bool] = None
+    ) -> AsyncGenerator[BatchItem, None]:
+        """
+        Stream batch results as they finish (ordered=False) or in prompt order
+        (ordered=True, each item is yielded as soon as all earlier ones are done).
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
+        timeout = item_timeout if item_timeout is not None else self.batch_item_timeout
+        
+        async def run_one(index: int, prompt: str) -> BatchItem:
+            async with semaphore:
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                
+                started = time.monotonic()
+                item = BatchItem(index=index, prompt=prompt)
+                try:
+                    item.text = await asyncio.wait_for(
+                        self._complete(messages, temperature, max_tokens, use_cache),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    item.error = f"timed out after {timeout}s"
+                    item.timed_out = True
+                except Exception as e:
+                    item.error = f"{type(e).__name__}: {e}"
+                item.latency = time.monotonic() - started
+                return item
+        
+        tasks = [asyncio.create_task(run_one(i, p)) for i, p in enumerate(prompts)]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield await task
+            else:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        use_cache: Optional[bool]
+    ) -> str:
+        """Complete (non-streaming) generation that raises instead of apologizing"""
+        if self.provider != "ollama":
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        response_text = ""
+        async for chunk in self._chat_stream(messages, temperature, max_tokens, False, use_cache):
+            response_text += chunk
+        return response_text
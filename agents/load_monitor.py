@@ -0,0 +1,162 @@
+"""
+Load Monitor - Worker load reporting for LiveKit job dispatch
+Combines active sessions, CPU use of the worker's process tree (job
+processes run the Silero VAD inference) and event-loop lag into one 0..1
+load figure. Once it crosses the load threshold LiveKit stops dispatching
+jobs to this worker. Loop lag is measured inside each job process, where
+sessions run, and read back from the worker's multiprocess metrics.
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from prometheus_client import Gauge
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from .metrics_server import MULTIPROC_ENV
+
+logger = logging.getLogger(__name__)
+
+# Per-process CPU accounting needs the optional ``psutil`` package
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+# Metrics (job processes; the aggregate is the worst live process)
+LOOP_LAG_METRIC = "worker_loop_lag_seconds"
+WORKER_LOOP_LAG = Gauge(
+    LOOP_LAG_METRIC, "Most recent event-loop scheduling delay in a job process",
+    multiprocess_mode="livemax"
+)
+
+
+class LoadMonitor:
+    """
+    Load function for AgentServer/WorkerOptions (``load_fnc``).
+    The reported load is the highest of:
+      - active sessions / max_sessions
+      - CPU seconds used by this process and its job processes per wall second,
+        divided by the cores available
+      - the worst event-loop lag of a live job process / max_loop_lag_ms
+    """
+
+    def __init__(self, max_sessions: int = 8, max_loop_lag_ms: float = 200.0):
+        self.max_sessions = max(1, max_sessions)
+        self.max_loop_lag = max_loop_lag_ms / 1000
+        self.cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self._last_cpu: Optional[float] = None
+        self._last_wall: Optional[float] = None
+        # Last reported figures, exposed by collect()
+        self._reported = {"load": 0.0, "active": 0, "cpu": 0.0, "lag": 0.0}
+        if not PSUTIL_AVAILABLE:
+            logger.info("psutil not installed - using the system load average for worker CPU load")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LoadMonitor":
+        worker_config = config.get("worker", {})
+        return cls(
+            max_sessions=worker_config.get("max_sessions", 8),
+            max_loop_lag_ms=worker_config.get("max_loop_lag_ms", 200)
+        )
+
+    def __call__(self, worker: Any = None) -> float:
+        """Compute the current load; LiveKit calls this periodically (off the event loop)"""
+        active = len(getattr(worker, "active_jobs", None) or [])
+        session_load = active / self.max_sessions
+        cpu_load = self._cpu_utilization()
+        loop_lag = self._job_loop_lag()
+        lag_load = loop_lag / self.max_loop_lag if self.max_loop_lag > 0 else 0.0
+
+        load = min(1.0, max(session_load, cpu_load, lag_load))
+        self._reported = {"load": load, "active": active, "cpu": cpu_load, "lag": loop_lag}
+        return load
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """prometheus_client collector: the figures behind the last reported load"""
+        reported = self._reported
+        yield GaugeMetricFamily("worker_load", "Load reported to LiveKit dispatch (0..1)", value=reported["load"])
+        yield GaugeMetricFamily(
+            "worker_active_sessions", "Interview sessions running on this worker", value=reported["active"]
+        )
+        yield GaugeMetricFamily(
+            "worker_cpu_utilization", "CPU use of the worker process tree per available core (0..1)",
+            value=reported["cpu"]
+        )
+        yield GaugeMetricFamily(
+            "worker_reported_loop_lag_seconds", "Worst job-process event-loop lag behind the last reported load",
+            value=reported["lag"]
+        )
+
+    def _job_loop_lag(self) -> float:
+        """Worst loop lag among live job processes, from their multiprocess gauge files"""
+        path = os.environ.get(MULTIPROC_ENV)
+        if not path:
+            return 0.0
+        # Only the livemax gauge files; exited processes remove theirs
+        files = glob.glob(os.path.join(path, "gauge_livemax_*.db"))
+        try:
+            metrics = MultiProcessCollector.merge(files, accumulate=False)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read job loop lag: {e}")
+            return 0.0
+        for metric in metrics:
+            if metric.name == LOOP_LAG_METRIC:
+                return max((sample.value for sample in metric.samples), default=0.0)
+        return 0.0
+
+    def _cpu_utilization(self) -> float:
+        """CPU used by the process tree since the previous call, per available core"""
+        if not PSUTIL_AVAILABLE:
+            try:
+                return min(1.0, os.getloadavg()[0] / self.cpu_count)
+            except OSError:
+                return 0.0
+
+        try:
+            process = psutil.Process()
+            cpu = sum(process.cpu_times()[:2])
+            for child in process.children(recursive=True):
+                try:
+                    cpu += sum(child.cpu_times()[:2])
+                except psutil.Error:
+                    continue  # job process exited between listing and sampling
+        except psutil.Error:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            last_cpu, last_wall = self._last_cpu, self._last_wall
+            self._last_cpu, self._last_wall = cpu, now
+        if last_cpu is None or now <= last_wall:
+            return 0.0
+        # Exited job processes take their CPU time with them, so clamp at zero
+        used = max(0.0, cpu - last_cpu)
+        return min(1.0, used / (now - last_wall) / self.cpu_count)
+
+
+# One lag probe per job process
+_lag_probe: Optional[asyncio.Task] = None
+
+
+def start_loop_lag_probe(interval: float = 1.0):
+    """Sample this process's event-loop lag every interval into worker_loop_lag_seconds (once per process)"""
+    global _lag_probe
+    if _lag_probe is None or _lag_probe.done():
+        _lag_probe = asyncio.create_task(_probe_loop_lag(interval))
+
+
+async def _probe_loop_lag(interval: float):
+    while True:
+        scheduled = time.monotonic()
+        await asyncio.sleep(interval)
+        WORKER_LOOP_LAG.set(max(0.0, time.monotonic() - scheduled - interval))
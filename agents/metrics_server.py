@@ -0,0 +1,56 @@
+"""
+Metrics Server - One Prometheus endpoint for the whole agent worker
+Job processes record their metrics into prometheus_client's multiprocess
+directory (PROMETHEUS_MULTIPROC_DIR); the main worker process serves the
+aggregate of every job process, including ones that have already exited,
+on a single fixed port.
+"""
+
+import atexit
+import logging
+import os
+from typing import Optional
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+from prometheus_client.registry import Collector
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+def enable_multiprocess_metrics(path: str) -> str:
+    """
+    Point job processes started from here on at a multiprocess metrics
+    directory (an existing PROMETHEUS_MULTIPROC_DIR wins). The LiveKit worker
+    clears it on startup, before the first job process is spawned.
+    """
+    path = os.environ.setdefault(MULTIPROC_ENV, path)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def mark_process_dead_at_exit():
+    """Drop this process's live gauges from the aggregate when it exits (counters and histograms stay)"""
+    if MULTIPROC_ENV in os.environ:
+        atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def start_metrics_server(
+    host: str = "0.0.0.0",
+    port: int = 9100,
+    collector: Optional[Collector] = None
+) -> Optional[int]:
+    """Serve /metrics for every process sharing the multiprocess directory, plus `collector`; returns the port"""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if collector is not None:
+        registry.register(collector)
+    try:
+        server, _ = start_http_server(port, addr=host, registry=registry)
+    except OSError as e:
+        logger.warning(f"Could not serve metrics on {host}:{port}: {e}")
+        return None
+    bound = server.server_port
+    logger.info(f"📊 Serving worker metrics on http://{host}:{bound}/metrics")
+    return bound
@@ -1,8 +1,11 @@
 import asyncio
+import httpx
 import ollama
 import logging
+import os
+import time
 import uuid
-from typing import AsyncIterator
+from typing import AsyncIterator, Dict, Optional, Tuple
 
 from livekit.agents.llm import (
     LLM,
@@ -12,9 +15,55 @@ from livekit.agents.llm import (
     ChatRole,
     ChoiceDelta,
 )
+from prometheus_client import Gauge, Histogram
 
 logger = logging.getLogger(__name__)
 
+# Metrics
+OLLAMA_QUEUE_WAIT = Histogram(
+    "ollama_queue_wait_seconds", "Time a request waited for a per-model Ollama slot", ("model",)
+)
+OLLAMA_WAITING = Gauge(
+    "ollama_requests_waiting", "Requests waiting for a per-model Ollama slot", ("model",),
+    multiprocess_mode="livesum"
+)
+OLLAMA_IN_FLIGHT = Gauge(
+    "ollama_requests_in_flight", "Requests currently running against Ollama", ("model",),
+    multiprocess_mode="livesum"
+)
+
+# One configured client per host and one slot semaphore per (host, model),
+# shared by every OllamaLLM in this worker process
+_clients: Dict[str, ollama.AsyncClient] = {}
+_model_slots: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+
+
+def get_ollama_client(host: str, max_connections: int = 20) -> ollama.AsyncClient:
+    """Get the shared, pooled Ollama client for a host"""
+    client = _clients.get(host)
+    if client is None:
+        # Extra kwargs are passed through to the underlying httpx.AsyncClient
+        client = ollama.AsyncClient(
+            host=host,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+        )
+        _clients[host] = client
+        logger.info(f"Created Ollama client for {host} (max_connections={max_connections})")
+    return client
+
+
+def get_model_slots(host: str, model: str, max_parallel: int) -> asyncio.Semaphore:
+    """Get the semaphore capping in-flight requests for a model on a host"""
+    key = (host, model)
+    slots = _model_slots.get(key)
+    if slots is None:
+        slots = asyncio.Semaphore(max_parallel)
+        _model_slots[key] = slots
+    return slots
+
 
 class AsyncIteratorContextManager:
     """Wrapper to make async iterator work as async context manager"""
@@ -44,28 +93,73 @@ class OllamaLLM(LLM):
     """
     Drop-in LLM adapter for Ollama compatible with LiveKit Agents SDK v1.3+.
     Implements BOTH required abstract methods: generate() and chat().
+    
+    Uses ollama.AsyncClient so every chunk read is awaited on the event loop
+    instead of blocking it (the loop also drives VAD, STT and TTS).
     """
 
     def __init__(
         self,
         model: str = "llama3.1",
         base_url: str = "http://host.docker.internal:11434",
+        max_parallel: Optional[int] = None,
+        max_connections: int = 20,
     ):
         super().__init__()
         self._model = model
-        self.base_url = base_url
-        # Configure Ollama client to use custom host if provided
-        import os
-        ollama_host = os.getenv("OLLAMA_HOST")
-        if ollama_host:
-            import ollama
-            # Set the host for Ollama client
-            ollama.Client(host=ollama_host)
+        # OLLAMA_HOST overrides the configured base URL
+        self.base_url = os.getenv("OLLAMA_HOST") or base_url
+        self._client = get_ollama_client(self.base_url, max_connections)
+        # Match what the Ollama server can actually run at once (its OLLAMA_NUM_PARALLEL)
+        if max_parallel is None:
+            max_parallel = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+        self.max_parallel = max_parallel
 
     @property
     def model(self):
         return self._model
 
+    async def _stream_chat(self, payload: list[dict]) -> AsyncIterator[str]:
+        """Stream content deltas from Ollama; closing this generator closes the upstream stream"""
+        slots = get_model_slots(self.base_url, self.model, self.max_parallel)
+        
+        # Queue for a slot so sessions don't pile onto a saturated model server
+        queued_at = time.monotonic()
+        OLLAMA_WAITING.labels(model=self.model).inc()
+        try:
+            await slots.acquire()
+        finally:
+            OLLAMA_WAITING.labels(model=self.model).dec()
+        wait = time.monotonic() - queued_at
+        OLLAMA_QUEUE_WAIT.labels(model=self.model).observe(wait)
+        if wait > 1.0:
+            logger.warning(f"Waited {wait:.2f}s for an Ollama slot for {self.model}")
+        
+        OLLAMA_IN_FLIGHT.labels(model=self.model).inc()
+        stream = None
+        try:
+            stream = await self._client.chat(
+                model=self.model,
+                messages=payload,
+                stream=True,
+            )
+            async for chunk in stream:
+                if "message" in chunk and "content" in chunk["message"]:
+                    content = chunk["message"]["content"]
+                    if content:
+                        yield content
+
+                if chunk.get("done"):
+                    break
+        finally:
+            # Runs on completion, error and cancellation alike
+            try:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+            finally:
+                OLLAMA_IN_FLIGHT.labels(model=self.model).dec()
+                slots.release()
+
     async def generate(self, messages: list[ChatMessage]) -> ChatMessage:
         """Non-streaming version used by AgentSession.generate_reply()"""
         payload = [
@@ -73,19 +167,11 @@ class OllamaLLM(LLM):
             for m in messages
         ]
 
-        loop = asyncio.get_event_loop()
         try:
-            result = await loop.run_in_executor(
-                None,
-                lambda: ollama.chat(
-                    model=self.model,
-                    messages=payload,
-                    stream=False,
-                )
-            )
-
-            content = result["message"]["content"]
-            return ChatMessage(role=ChatRole.ASSISTANT, content=content)
+            parts = []
+            async for content in self._stream_chat(payload):
+                parts.append(content)
+            return ChatMessage(role=ChatRole.ASSISTANT, content="".join(parts))
 
         except Exception as e:
             logger.error(f"Ollama generate() error: {e}", exc_info=True)
@@ -107,30 +193,12 @@ class OllamaLLM(LLM):
                         "content": msg.content,
                     })
 
-                loop = asyncio.get_event_loop()
-
-                # Run synchronous streaming in a thread
-                stream = await loop.run_in_executor(
-                    None,
-                    lambda: ollama.chat(
-                        model=self.model,
-                        messages=payload,
-                        stream=True,
+                async for content in self._stream_chat(payload):
+                    # ChatChunk requires id and delta as ChoiceDelta
+                    yield ChatChunk(
+                        id=str(uuid.uuid4()),
+                        delta=ChoiceDelta(content=content)
                     )
-                )
-
-                for chunk in stream:
-                    if "message" in chunk and "content" in chunk["message"]:
-                        content = chunk["message"]["content"]
-                        
-                        # ChatChunk requires id and delta as ChoiceDelta
-                        yield ChatChunk(
-                            id=str(uuid.uuid4()),
-                            delta=ChoiceDelta(content=content)
-                        )
-
-                    if chunk.get("done"):
-                        break
 
             except Exception as e:
                 logger.error(f"Ollama chat() streaming error: {e}", exc_info=True)
@@ -0,0 +1,179 @@
+"""
+Resilience - Retry backoff, retry budgets and circuit breakers for LLM endpoints
+"""
+
+import logging
+import random
+import time
+from typing import Dict, Any
+import httpx
+from prometheus_client import REGISTRY, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Metrics
+LLM_RETRIES = Counter(
+    "llm_retries_total", "LLM requests retried after a retryable error", ("endpoint",)
+)
+LLM_RETRY_BUDGET_EXHAUSTED = Counter(
+    "llm_retry_budget_exhausted_total", "Retries skipped because the retry budget was empty", ("endpoint",)
+)
+LLM_CIRCUIT_STATE = Gauge(
+    "llm_circuit_breaker_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)", ("endpoint",),
+    multiprocess_mode="liveall"  # one breaker per process
+)
+LLM_CIRCUIT_REJECTIONS = Counter(
+    "llm_circuit_breaker_rejections_total", "LLM requests failed fast by an open circuit", ("endpoint",)
+)
+
+# HTTP statuses that indicate a saturated or temporarily unavailable server
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected by an open circuit breaker"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is worth retrying (timeouts, connection errors, overload statuses)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries to a fraction of regular traffic, so retries
+    cannot amplify an overload. Each request deposits `ratio` tokens and a
+    floor of `min_per_second` tokens refills over time; each retry costs one.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_tokens,
+            self._tokens + (now - self._last_refill) * self.min_per_second
+        )
+        self._last_refill = now
+
+    def record_request(self):
+        """Deposit tokens for a new (non-retry) request"""
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Withdraw one token for a retry; False if the budget is exhausted"""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    Opens after `failure_threshold` consecutive failures, fails fast while open,
+    and lets a single probe through every `recovery_timeout` seconds (half-open).
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, recovery_timeout: float = 10.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        LLM_CIRCUIT_STATE.labels(endpoint=endpoint).set(0)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit breaker for {self.endpoint}: {self.state} -> {state}")
+            self.state = state
+            LLM_CIRCUIT_STATE.labels(endpoint=self.endpoint).set(self._STATE_VALUES[state])
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now"""
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self._opened_at >= self.recovery_timeout:
+            # Let one probe through; restart the window so only one probe runs at a time
+            self._opened_at = time.monotonic()
+            self._set_state(self.HALF_OPEN)
+            return True
+        LLM_CIRCUIT_REJECTIONS.labels(endpoint=self.endpoint).inc()
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+
+# Process-wide guards, one per endpoint
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_retry_budgets: Dict[str, RetryBudget] = {}
+
+
+def get_circuit_breaker(endpoint: str, failure_threshold: int = 5, recovery_timeout: float = 10.0) -> CircuitBreaker:
+    """Get the shared circuit breaker for an endpoint"""
+    breaker = _circuit_breakers.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(endpoint, failure_threshold, recovery_timeout)
+        _circuit_breakers[endpoint] = breaker
+    return breaker
+
+
+def get_retry_budget(endpoint: str, ratio: float = 0.2, min_per_second: float = 1.0) -> RetryBudget:
+    """Get the shared retry budget for an endpoint"""
+    budget = _retry_budgets.get(endpoint)
+    if budget is None:
+        budget = RetryBudget(ratio=ratio, min_per_second=min_per_second)
+        _retry_budgets[endpoint] = budget
+    return budget
+
+
+def resilience_stats(endpoint: str) -> Dict[str, Any]:
+    """Breaker state and retry counters for an endpoint"""
+    breaker = _circuit_breakers.get(endpoint)
+    budget = _retry_budgets.get(endpoint)
+    return {
+        "circuit_state": breaker.state if breaker else CircuitBreaker.CLOSED,
+        "consecutive_failures": breaker.consecutive_failures if breaker else 0,
+        "retries": _counter_value("llm_retries_total", endpoint),
+        "retry_budget_exhausted": _counter_value("llm_retry_budget_exhausted_total", endpoint),
+        "circuit_rejections": _counter_value("llm_circuit_breaker_rejections_total", endpoint),
+        "retry_budget_tokens": budget.tokens if budget else None,
+    }
+
+
+def _counter_value(name: str, endpoint: str) -> float:
+    return REGISTRY.get_sample_value(name, {"endpoint": endpoint}) or 0.0
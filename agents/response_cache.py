@@ -0,0 +1,116 @@
+"""
+Response Cache - Two-tier (in-process LRU + optional Redis) cache for LLM responses
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Caches complete LLM responses keyed on the generation inputs.
+    The local tier is an LRU with size and TTL eviction; the optional Redis
+    tier lets replicas share responses with each other.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        redis_client: Optional[redis.Redis] = None,
+        key_prefix: str = "llm:cache:"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Build a cache key from the generation inputs"""
+        system_hash = hashlib.sha256((system_prompt or "").encode()).hexdigest()
+        raw = json.dumps([model, system_hash, prompt, temperature, max_tokens])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response, checking the local tier before Redis"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.redis_client:
+            try:
+                value = await self.redis_client.get(self.key_prefix + key)
+                if value is not None:
+                    value = value.decode() if isinstance(value, bytes) else value
+                    self._store_local(key, value)
+                    self.hits += 1
+                    self.redis_hits += 1
+                    return value
+            except Exception as e:
+                logger.error(f"Failed to read response cache from Redis: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """Store a response in both tiers"""
+        self._store_local(key, value)
+
+        if self.redis_client:
+            try:
+                await self.redis_client.set(
+                    self.key_prefix + key,
+                    value,
+                    ex=int(self.ttl_seconds)
+                )
+            except Exception as e:
+                logger.error(f"Failed to write response cache to Redis: {e}")
+
+    def _store_local(self, key: str, value: str):
+        """Insert into the LRU, evicting the least recently used entry if full"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every local entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
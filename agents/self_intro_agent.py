@@ -3,7 +3,6 @@ Self-Introduction Agent - Handles the self-introduction stage of the interview
 """
 
 import logging
-from pathlib import Path
 from typing import Optional
 from livekit import agents, rtc
 from livekit.agents import (
@@ -18,6 +17,7 @@ from livekit.agents.voice_assistant import VoiceAssistant
 from livekit.plugins import openai, silero
 
 from .base_agent import BaseInterviewAgent
+from .turn_metrics import TurnTimer
 from .stage_manager import StageManager, InterviewStage
 from .llm_client import LLMClient
 
@@ -34,10 +34,9 @@ class SelfIntroAgent(BaseInterviewAgent):
         *args,
         **kwargs
     ):
-        # Load system prompt
-        prompt_path = Path(__file__).parent.parent / "config" / "prompts" / "self_intro.txt"
-        with open(prompt_path, 'r') as f:
-            system_prompt = f.read()
+        # System prompt from the compiled stage graph (read once per config load)
+        system_prompt = stage_manager.graph.spec(InterviewStage.SELF_INTRO).prompt or ""
+        system_prompt += "\n\nRespond to the candidate's latest message in a natural, conversational way. Keep it brief (2-3 sentences max)."
         
         super().__init__(
             stage=InterviewStage.SELF_INTRO,
@@ -47,14 +46,12 @@ class SelfIntroAgent(BaseInterviewAgent):
             *args,
             **kwargs
         )
-        
-        self.max_follow_ups = 2
-        self.conversation_history = []
     
     async def on_user_speech_committed(self, message: str):
         """Called when user speech is committed"""
         logger.info(f"User said: {message}")
-        self.conversation_history.append({"role": "user", "content": message})
+        turn = self.start_turn()
+        self.record_turn("user", message)
         
         # Check if we should still be in this stage
         if not await self.should_speak():
@@ -66,42 +63,28 @@ class SelfIntroAgent(BaseInterviewAgent):
             return
         
         # Generate response
-        await self._generate_and_speak(message)
+        await self._generate_and_speak(message, turn=turn)
     
-    async def _generate_and_speak(self, user_message: str):
+    async def _generate_and_speak(self, user_message: str, turn: Optional[TurnTimer] = None):
         """Generate LLM response and speak it"""
         try:
-            # Build conversation context
-            context = "\n".join([
-                f"{msg['role']}: {msg['content']}"
-                for msg in self.conversation_history[-5:]  # Last 5 messages
-            ])
+            # System prompt + prior turns form an append-only prefix that the
+            # model server can serve from its prompt cache
+            messages = [{"role": "system", "content": self.system_prompt}]
+            messages.extend(self.context_window.to_messages())
             
-            prompt = f"""Based on the conversation so far:
-
-{context}
-
-Generate a natural, conversational response. Keep it brief (2-3 sentences max)."""
-            
-            # Generate response using Ollama
-            response_text = ""
-            async for chunk in self.llm_client.generate(
-                prompt=prompt,
-                system_prompt=self.system_prompt,
+            # Stream the response to TTS one sentence at a time
+            response_text = await self.speak_stream(self.llm_client.chat(
+                messages=messages,
                 temperature=0.7,
                 max_tokens=200,
                 stream=True
-            ):
-                response_text += chunk
+            ), turn=turn)
             
             if response_text.strip():
-                logger.info(f"Agent responding: {response_text[:100]}...")
-                self.conversation_history.append({"role": "assistant", "content": response_text})
+                self.record_turn("assistant", response_text)
                 self.follow_up_count += 1
                 
-                # Speak the response
-                await self.say(response_text, allow_interruptions=True)
-                
                 # Check if response indicates stage completion
                 if any(phrase in response_text.lower() for phrase in [
                     "let's move on", "next stage", "move to", "let's discuss"
@@ -118,11 +101,11 @@ Generate a natural, conversational response. Keep it brief (2-3 sentences max)."
         
         # Wait for stage to be SELF_INTRO
         current_stage = await self.stage_manager.get_current_stage()
-        if current_stage == InterviewStage.SELF_INTRO:
+        greeting = self.stage_manager.graph.spec(self.stage).opening_line
+        if current_stage == self.stage and greeting:
             # Start with introduction
-            greeting = "Hello! I'm conducting your interview today. To start, could you tell me a bit about yourself - your background, what you're passionate about, and what brings you here today?"
             await self.say(greeting, allow_interruptions=True)
-            self.conversation_history.append({"role": "assistant", "content": greeting})
+            self.record_turn("assistant", greeting)
 
 
 async def entrypoint(ctx: JobContext):
@@ -145,7 +128,7 @@ async def entrypoint(ctx: JobContext):
     await stage_manager.initialize(ctx.room.sid)
     
     # Initialize LLM client
-    llm_client = LLMClient()
+    llm_client = LLMClient(redis_client=redis_client)
     
     # Create agent
     agent = SelfIntroAgent(
@@ -0,0 +1,61 @@
+"""
+Sentence Stream - Splits streamed LLM tokens into speakable sentences
+Lets TTS start on the first sentence while the rest is still being generated.
+"""
+
+import re
+from typing import AsyncIterable, AsyncGenerator, List, Optional
+
+# Sentence-ending punctuation (optionally followed by closing quotes/brackets)
+# and the whitespace after it. Requiring the whitespace means we only split
+# once the next token has arrived, so "3.5" or "e.g." mid-stream are not cut.
+_SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*\s+')
+
+# Common abbreviations that end with a period but do not end a sentence
+_ABBREVIATIONS = {"e.g.", "i.e.", "etc.", "vs.", "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr."}
+
+
+class SentenceSegmenter:
+    """Incrementally segments a token stream into complete sentences"""
+
+    def __init__(self, min_chars: int = 20):
+        # Very short fragments ("Great!") are merged with the next sentence
+        # so TTS is not fed choppy one-word utterances.
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def push(self, chunk: str) -> List[str]:
+        """Add a chunk and return any sentences that are now complete"""
+        self._buffer += chunk
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            end = match.end()
+            candidate = self._buffer[start:end].strip()
+            last_word = candidate.rsplit(None, 1)[-1].lower() if candidate else ""
+            if last_word in _ABBREVIATIONS or len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text remains at the end of the stream"""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+async def stream_sentences(
+    chunks: AsyncIterable[str],
+    min_chars: int = 20
+) -> AsyncGenerator[str, None]:
+    """Yield complete sentences from an async stream of text chunks"""
+    segmenter = SentenceSegmenter(min_chars=min_chars)
+    async for chunk in chunks:
+        for sentence in segmenter.push(chunk):
+            yield sentence
+    remainder = segmenter.flush()
+    if remainder:
+        yield remainder
@@ -0,0 +1,131 @@
+"""
+Single Flight - Coalesces identical in-flight LLM requests
+The first caller for a key starts the upstream call; concurrent callers with the
+same key attach to it and receive the same streamed chunks. If that call is
+cancelled from outside while callers are still listening, they start (or join)
+a new one and carry on where they were.
+"""
+
+import asyncio
+import logging
+from typing import Callable, AsyncIterator, AsyncGenerator, Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One shared upstream call and the chunks it has produced so far"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+
+class SingleFlight:
+    """Shares one upstream stream between all concurrent callers with the same key"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        # Counters
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    async def stream(
+        self,
+        key: str,
+        factory: Callable[[], AsyncIterator[str]]
+    ) -> AsyncGenerator[str, None]:
+        """Yield the chunks of the in-flight call for key, starting it if needed"""
+        # Text already yielded, so a replacement call can resume after it
+        yielded = ""
+        while True:
+            flight = self._join(key, factory)
+            flight.subscribers += 1
+            try:
+                index = 0
+                position = 0  # characters of this flight's output consumed
+                while True:
+                    async with flight.changed:
+                        await flight.changed.wait_for(
+                            lambda: len(flight.chunks) > index or flight.done
+                        )
+                        new_chunks = flight.chunks[index:]
+                        finished = flight.done
+                    index += len(new_chunks)
+                    for chunk in new_chunks:
+                        start, position = position, position + len(chunk)
+                        if start < len(yielded):
+                            # Replayed by a replacement call - skip what was already sent
+                            if yielded[start:position] != chunk[:len(yielded) - start]:
+                                raise RuntimeError(f"Replacement call for {key} diverged from the cancelled one")
+                            chunk = chunk[len(yielded) - start:]
+                            if not chunk:
+                                continue
+                        yielded += chunk
+                        yield chunk
+                    if finished and index >= len(flight.chunks):
+                        if flight.error is not None:
+                            raise flight.error
+                        break
+            finally:
+                flight.subscribers -= 1
+                # Nobody is listening any more - stop the upstream call. Unregister
+                # it first so a caller arriving before it has unwound starts a new
+                # call instead of joining a cancelled one.
+                if flight.subscribers == 0 and not flight.done and flight.task:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                    flight.task.cancel()
+            if not flight.cancelled:
+                return
+            logger.info(f"In-flight call for {key} was cancelled, restarting it for a waiting caller")
+
+    def _join(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> _Flight:
+        """The in-flight call for key, started if there is none"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, factory))
+            self.upstream_calls += 1
+        else:
+            self.coalesced_calls += 1
+        return flight
+
+    async def _run(
+        self,
+        key: str,
+        flight: _Flight,
+        factory: Callable[[], AsyncIterator[str]]
+    ):
+        """Drive the upstream stream and fan chunks out to subscribers"""
+        try:
+            async for chunk in factory():
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            # Subscribers still listening start a new call (see stream)
+            flight.cancelled = True
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        return {
+            "in_flight": len(self._flights),
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self.coalesced_calls,
+        }
@@ -0,0 +1,223 @@
+"""
+Speculative Drafter - Starts drafting the agent's reply from interim STT transcripts
+The draft is used if the final transcript barely differs from the interim text
+it was based on, and discarded otherwise. It streams into a buffer, so the reply
+can start from it before it has finished generating. Stages opt in with
+``agents.<stage>.speculative.enabled`` in settings.yaml.
+"""
+
+import asyncio
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional
+
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_DRAFTS = Counter(
+    "speculative_drafts_total", "Speculative reply drafts by outcome", ("outcome",)
+)
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def transcript_similarity(a: List[str], b: List[str]) -> float:
+    """Word-level similarity ratio between two normalized transcripts"""
+    if not a and not b:
+        return 1.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+class DraftStream:
+    """
+    A draft reply being generated. Chunks are buffered as they arrive;
+    iterating replays the buffer and then follows the generation live.
+    """
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.started = False
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    async def append(self, chunk: str):
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self):
+        async with self._changed:
+            self.done = True
+            self._changed.notify_all()
+
+    async def __aiter__(self):
+        index = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: len(self.chunks) > index or self.done)
+                    new_chunks = self.chunks[index:]
+                    finished = self.done
+                index += len(new_chunks)
+                for chunk in new_chunks:
+                    yield chunk
+                if finished and index >= len(self.chunks):
+                    return
+        finally:
+            # The reply was interrupted - stop generating the rest of it
+            self.cancel()
+
+    def cancel(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+
+class SpeculativeDrafter:
+    """Drafts a reply while the candidate is still speaking"""
+
+    def __init__(
+        self,
+        draft_fn: Callable[[str], AsyncIterator[str]],
+        min_words: int = 4,
+        debounce_seconds: float = 0.3,
+        similarity_threshold: float = 0.9
+    ):
+        self.draft_fn = draft_fn
+        self.min_words = min_words
+        self.debounce_seconds = debounce_seconds
+        self.similarity_threshold = similarity_threshold
+        self._draft: Optional[DraftStream] = None
+        self._basis: Optional[List[str]] = None
+
+    def update(self, interim_text: str):
+        """Feed an interim transcript; (re)starts a draft if it changed materially"""
+        words = _words(interim_text)
+        if len(words) < self.min_words:
+            return
+        if self._draft and self._basis is not None:
+            if transcript_similarity(self._basis, words) >= self.similarity_threshold:
+                return  # Current draft is still a good match
+        self.cancel()
+        self._basis = words
+        self._draft = DraftStream()
+        self._draft.task = asyncio.create_task(self._generate(interim_text, self._draft))
+
+    async def _generate(self, interim_text: str, draft: DraftStream):
+        try:
+            # Wait for the interim transcript to settle before spending a generation
+            await asyncio.sleep(self.debounce_seconds)
+            draft.started = True
+            async for chunk in self.draft_fn(interim_text):
+                await draft.append(chunk)
+        except asyncio.CancelledError:
+            await draft.finish()
+            raise
+        except Exception as e:
+            logger.error(f"Speculative draft failed: {e}")
+            SPECULATIVE_DRAFTS.labels(outcome="error").inc()
+        await draft.finish()
+
+    def take(self, final_text: str) -> Optional[DraftStream]:
+        """
+        The draft, if it matches the final transcript and has started
+        generating (it may still be running); else it is discarded.
+        """
+        draft, basis = self._draft, self._basis
+        self._draft = None
+        self._basis = None
+        if draft is None:
+            return None
+
+        similarity = transcript_similarity(basis or [], _words(final_text))
+        if similarity < self.similarity_threshold:
+            draft.cancel()
+            SPECULATIVE_DRAFTS.labels(outcome="discarded").inc()
+            logger.debug(f"Discarding speculative draft (similarity {similarity:.2f})")
+            return None
+
+        if not draft.started:
+            # Still debouncing: a reply to the final transcript starts just as soon
+            draft.cancel()
+            SPECULATIVE_DRAFTS.labels(outcome="not_started").inc()
+            return None
+        if draft.done and not draft.chunks:
+            SPECULATIVE_DRAFTS.labels(outcome="empty").inc()
+            return None
+        SPECULATIVE_DRAFTS.labels(outcome="used").inc()
+        return draft
+
+    def cancel(self):
+        """Drop any in-progress draft"""
+        if self._draft:
+            self._draft.cancel()
+        self._draft = None
+        self._basis = None
+
+
+class InterimDrafts:
+    """
+    Feeds an AgentSession's interim transcripts to a drafter for the current
+    stage, and hands the matching draft to the reply for the final transcript.
+    """
+
+    def __init__(
+        self,
+        stage_fn: Callable[[], str],
+        config: Mapping[str, Any],
+        draft_fn: Callable[[str], AsyncIterator[str]]
+    ):
+        self.stage_fn = stage_fn
+        self.config = config
+        self.draft_fn = draft_fn
+        self._drafters: Dict[str, Optional[SpeculativeDrafter]] = {}
+
+    def drafter(self, stage: str) -> Optional[SpeculativeDrafter]:
+        """The stage's drafter, or None if speculation is off for it"""
+        if stage not in self._drafters:
+            speculative_config = self.config.get("agents", {}).get(stage, {}).get("speculative", {})
+            drafter = None
+            if speculative_config.get("enabled", False):
+                drafter = SpeculativeDrafter(
+                    self.draft_fn,
+                    min_words=speculative_config.get("min_words", 4),
+                    debounce_seconds=speculative_config.get("debounce_seconds", 0.3),
+                    similarity_threshold=speculative_config.get("similarity_threshold", 0.9)
+                )
+            self._drafters[stage] = drafter
+        return self._drafters[stage]
+
+    def attach(self, session: Any):
+        session.on("user_input_transcribed", self.on_user_input_transcribed)
+
+    def on_user_input_transcribed(self, event: Any):
+        """Session event handler: interim transcripts (re)start the stage's draft"""
+        if getattr(event, "is_final", True):
+            return  # the final transcript is matched in take()
+        drafter = self.drafter(self.stage_fn())
+        if drafter:
+            drafter.update(event.transcript)
+
+    def take(self, final_text: str) -> Optional[DraftStream]:
+        """Draft for the final transcript in the current stage, if it still matches"""
+        stage = self.stage_fn()
+        for other, drafter in self._drafters.items():
+            if other != stage and drafter:
+                drafter.cancel()  # drafted before a stage change
+        drafter = self.drafter(stage)
+        return drafter.take(final_text) if drafter else None
+
+    def cancel(self):
+        for drafter in self._drafters.values():
+            if drafter:
+                drafter.cancel()
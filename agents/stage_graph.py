@@ -0,0 +1,166 @@
+"""
+Stage Graph - Interview stage pipeline compiled from settings.yaml
+The ``stage_pipeline`` order and the per-stage entries under ``stages`` are
+compiled once per settings snapshot into an immutable table: next-stage and
+allowed-jump lookups are O(1) and each stage's timer settings, prompt text and
+opening line are resolved up front.
+"""
+
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+# Used when settings.yaml has no stage_pipeline section
+DEFAULT_ORDER = ("start", "self_intro", "experience", "end")
+
+
+def stage_id(stage: Union[str, Enum]) -> str:
+    """Plain stage name for a stage given as a string or an InterviewStage member"""
+    return stage.value if isinstance(stage, Enum) else str(stage)
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """Compiled settings for one stage"""
+    id: str
+    name: str
+    index: int
+    next: Optional[str]
+    allowed: FrozenSet[str]
+    fallback_timeout: Optional[float]
+    max_duration: Optional[float]
+    max_follow_ups: int
+    prompt: Optional[str]
+    opening_line: Optional[str]
+    agent: Optional[str]
+    terminal: bool
+
+
+class StageGraph:
+    """Immutable stage table: O(1) lookups, no per-transition allocation"""
+
+    def __init__(self, stages: Tuple[StageSpec, ...]):
+        self.order: Tuple[str, ...] = tuple(spec.id for spec in stages)
+        self._specs: Mapping[str, StageSpec] = MappingProxyType({spec.id: spec for spec in stages})
+        self.initial = self.order[0]
+        self.terminal = self.order[-1]
+        # Lines spoken on entering stages, for audio pre-synthesis
+        self.opening_lines: Tuple[str, ...] = tuple(
+            spec.opening_line for spec in stages if spec.opening_line
+        )
+
+    def __contains__(self, stage: Union[str, Enum]) -> bool:
+        return stage_id(stage) in self._specs
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def spec(self, stage: Union[str, Enum]) -> StageSpec:
+        return self._specs[stage_id(stage)]
+
+    def next_of(self, stage: Union[str, Enum]) -> Optional[str]:
+        """Next stage in the pipeline (None for the terminal stage)"""
+        spec = self._specs.get(stage_id(stage))
+        return spec.next if spec else None
+
+    def can_transition(self, current: Union[str, Enum], target: Union[str, Enum]) -> bool:
+        spec = self._specs.get(stage_id(current))
+        return spec is not None and stage_id(target) in spec.allowed
+
+    def is_terminal(self, stage: Union[str, Enum]) -> bool:
+        return stage_id(stage) == self.terminal
+
+    def agent_class(self, stage: Union[str, Enum]) -> Optional[type]:
+        """Import the stage's agent class ("package.module.ClassName"), if configured"""
+        path = self.spec(stage).agent
+        if not path:
+            return None
+        module_name, _, class_name = path.rpartition(".")
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+def _read_prompt(value: Optional[str]) -> Optional[str]:
+    """Prompt text from a file under config/ (e.g. prompts/self_intro.txt)"""
+    if not value:
+        return None
+    path = CONFIG_DIR / value
+    try:
+        return path.read_text()
+    except OSError as e:
+        logger.warning(f"Could not read stage prompt {path}: {e}")
+        return None
+
+
+def compile_stage_graph(settings: Mapping[str, Any]) -> StageGraph:
+    """Validate the stage configuration and build the immutable table"""
+    pipeline = settings.get("stage_pipeline", {})
+    order = tuple(pipeline.get("order", DEFAULT_ORDER))
+    stages_config = settings.get("stages", {})
+    if len(order) < 2:
+        raise ValueError("stage_pipeline.order needs at least a start and an end stage")
+    if len(set(order)) != len(order):
+        raise ValueError(f"stage_pipeline.order has duplicate stages: {list(order)}")
+
+    specs = []
+    for index, name in enumerate(order):
+        stage_config = stages_config.get(name, {})
+        terminal = index == len(order) - 1
+        next_stage = None if terminal else order[index + 1]
+
+        allowed = set(stage_config.get("allowed", ()))
+        unknown = allowed - set(order)
+        if unknown:
+            raise ValueError(f"Stage {name} allows jumps to unknown stages: {sorted(unknown)}")
+        if next_stage:
+            allowed.add(next_stage)
+
+        # The first and last stages have no speaking phase, so no timer by default
+        default_timeout = None if index == 0 or terminal else 45
+        timeout = stage_config.get("fallback_timeout_seconds", default_timeout)
+
+        specs.append(StageSpec(
+            id=name,
+            name=stage_config.get("name", name.replace("_", " ").title()),
+            index=index,
+            next=next_stage,
+            allowed=frozenset(allowed),
+            fallback_timeout=float(timeout) if timeout else None,
+            max_duration=stage_config.get("max_duration_seconds"),
+            max_follow_ups=stage_config.get("max_follow_ups", 2),
+            prompt=_read_prompt(stage_config.get("prompt")),
+            opening_line=stage_config.get("opening_line"),
+            agent=stage_config.get("agent"),
+            terminal=terminal,
+        ))
+    return StageGraph(tuple(specs))
+
+
+# Compiled graph for the most recent settings snapshot
+_compiled: Optional[Tuple[Mapping[str, Any], StageGraph]] = None
+_compiled_lock = threading.Lock()
+
+
+def get_stage_graph(settings: Mapping[str, Any]) -> StageGraph:
+    """Compiled graph for a settings snapshot (recompiled only when the snapshot changes)"""
+    global _compiled
+    cached = _compiled
+    if cached is not None and cached[0] is settings:
+        return cached[1]
+    with _compiled_lock:
+        if _compiled is not None and _compiled[0] is settings:
+            return _compiled[1]
+        graph = compile_stage_graph(settings)
+        _compiled = (settings, graph)
+        return graph
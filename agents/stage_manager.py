@@ -4,19 +4,60 @@ Coordinates stage transitions, manages timers, and enforces single-agent speakin
 """
 
 import asyncio
+import json
 import logging
+import time
+import uuid
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from datetime import datetime, timedelta
 import redis.asyncio as redis
-import yaml
 from pathlib import Path
 
+from .config import get_settings
+from .stage_graph import StageGraph, get_stage_graph, stage_id
+from .timer_wheel import TimerHandle, get_timer_wheel
+
 logger = logging.getLogger(__name__)
 
+# Stage state lives in one hash per room: stage, started_at (epoch seconds), version
+STATE_TTL_SECONDS = 3600  # 1 hour expiry
+
+
+def state_key(room_id: str) -> str:
+    return f"interview:{room_id}:state"
+
+
+# Atomic compare-and-set transition. Checks the expected stage and version
+# (empty string = don't check), writes the new state stamped with the Redis
+# server clock, refreshes the expiry and publishes the stage event.
+# KEYS[1] state hash
+# ARGV: expected_stage, expected_version, new_stage, ttl, channel, origin
+# Returns {applied (1/0), stage, started_at, version} - the stored state
+TRANSITION_SCRIPT = """
+local current = redis.call('HMGET', KEYS[1], 'stage', 'started_at', 'version')
+local stage, started_at, version = current[1], current[2], tonumber(current[3]) or 0
+if (ARGV[1] ~= '' and stage ~= ARGV[1]) or (ARGV[2] ~= '' and version ~= tonumber(ARGV[2])) then
+    return {0, stage or '', started_at or '0', version}
+end
+local now = redis.call('TIME')
+started_at = string.format('%d.%06d', tonumber(now[1]), tonumber(now[2]))
+version = version + 1
+redis.call('HSET', KEYS[1], 'stage', ARGV[3], 'started_at', started_at, 'version', version)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+redis.call('PUBLISH', ARGV[5], cjson.encode({
+    stage = ARGV[3], started_at = tonumber(started_at), version = version, origin = ARGV[6]
+}))
+return {1, ARGV[3], started_at, version}
+"""
+
 
 class InterviewStage(str, Enum):
-    """Interview stage enumeration"""
+    """
+    Names of the default stages. The pipeline itself comes from settings.yaml
+    (see stage_graph), and stages are plain strings everywhere else; these
+    members compare equal to them.
+    """
     START = "start"
     SELF_INTRO = "self_intro"
     EXPERIENCE = "experience"
@@ -32,27 +73,40 @@ class StageManager:
     def __init__(
         self,
         redis_client: Optional[redis.Redis] = None,
-        config_path: Optional[Path] = None
+        config_path: Optional[Path] = None,
+        config: Optional[Dict[str, Any]] = None,
+        run_timers: bool = True
     ):
         self.redis_client = redis_client
-        self.current_stage = InterviewStage.START
+        # Only the process hosting the room's session arms stage deadlines;
+        # the API drives transitions but leaves the timers to the agent
+        self.run_timers = run_timers
         self.stage_start_time: Optional[datetime] = None
-        self.stage_timers: Dict[str, asyncio.Task] = {}
-        self.config = self._load_config(config_path)
+        # Monotonic equivalent of stage_start_time, for durations
+        self._stage_started_mono: Optional[float] = None
+        # Version of the Redis state hash this local copy reflects
+        self.version = 0
+        # Fallback deadline for the current stage, on the process-wide timer wheel
+        self._fallback_timer: Optional[TimerHandle] = None
+        # Shared, already-parsed settings snapshot (callers may pass one in)
+        self.config = config if config is not None else self._load_config(config_path)
+        # Compiled once per settings snapshot, shared by every manager
+        self.graph: StageGraph = get_stage_graph(self.config)
+        self.current_stage: str = self.graph.initial
         self.room_id: Optional[str] = None
-        # Flags for stage handling
-        self.flag_intro_start = False
-        self.flag_exp_start = False
+        # Stage change notification: waiters block on the condition until the
+        # version moves; other processes are told via Redis pub/sub
+        self.stage_version = 0
+        self._stage_changed = asyncio.Condition()
+        self._instance_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+        # Registered once; redis-py runs it by SHA and reloads it if Redis restarted
+        self._transition_script = redis_client.register_script(TRANSITION_SCRIPT) if redis_client else None
         
     def _load_config(self, config_path: Optional[Path]) -> Dict[str, Any]:
-        """Load configuration from YAML file"""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "settings.yaml"
-        
+        """Get the process-wide settings snapshot (parsed once, not per instance)"""
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            return get_settings(config_path)
         except Exception as e:
             logger.warning(f"Failed to load config: {e}, using defaults")
             return {
@@ -63,122 +117,286 @@ class StageManager:
             }
     
     async def initialize(self, room_id: str):
-        """Initialize stage manager for a room"""
+        """Initialize stage manager for a room (resets it to the initial stage)"""
         self.room_id = room_id
-        await self._set_stage(InterviewStage.START)
+        await self._set_stage(self.graph.initial, expected=None)
         logger.info(f"Stage manager initialized for room {room_id}")
+
+    async def attach(self, room_id: str) -> bool:
+        """Adopt an existing room's state without resetting it; False if the room has none"""
+        self.room_id = room_id
+        await self.refresh()
+        return self.version > 0
+
+    def _events_channel(self) -> str:
+        return f"interview:{self.room_id}:stage_events"
     
-    async def _set_stage(self, stage: InterviewStage):
-        """Set the current stage and update Redis"""
-        old_stage = self.current_stage
+    def _apply_state(self, stage: str, started_at: float, version: int):
+        """Update the local copy of the room's stage state"""
         self.current_stage = stage
-        self.stage_start_time = datetime.now()
-        
-        # Cancel old timer
-        if old_stage.value in self.stage_timers:
-            self.stage_timers[old_stage.value].cancel()
+        self.version = version
+        self.stage_start_time = datetime.fromtimestamp(started_at)
+        # Wall-clock age converted once, so later durations ignore clock jumps
+        self._stage_started_mono = time.monotonic() - max(0.0, time.time() - started_at)
+    
+    async def _set_stage(self, stage: str, expected: Optional[tuple] = None) -> bool:
+        """
+        Set the current stage and update Redis in one atomic round-trip.
+        `expected` is the (stage, version) the transition was decided from;
+        if Redis holds anything else the write is refused, the stored state
+        is adopted instead and False is returned. Local state only changes
+        once Redis has answered - Redis is the source of truth.
+        """
+        old_stage = self.current_stage
+        started_at = time.time()
+        version = self.version + 1
         
-        # Update Redis
         if self.redis_client:
+            expected_stage, expected_version = expected if expected else ("", "")
+            args = [
+                expected_stage,
+                expected_version,
+                stage,
+                STATE_TTL_SECONDS,
+                self._events_channel(),
+                self._instance_id,
+            ]
             try:
-                await self.redis_client.set(
-                    f"interview:{self.room_id}:stage",
-                    stage.value,
-                    ex=3600  # 1 hour expiry
+                applied, stored_stage, stored_started_at, stored_version = await self._run_transition_script(args)
+            except Exception as e:
+                logger.error(f"Failed to update Redis, keeping stage {old_stage}: {e}")
+                return False
+            
+            if not int(applied):
+                if not stored_stage:
+                    # The state expired or was deleted - re-create it from ours
+                    logger.warning(f"State for room {self.room_id} is missing, re-initializing it at {stage}")
+                    return await self._set_stage(stage, expected=None)
+                logger.info(
+                    f"Transition {old_stage} -> {stage} lost the race: "
+                    f"room is at {stored_stage} (version {stored_version})"
                 )
-                await self.redis_client.set(
-                    f"interview:{self.room_id}:stage_start",
-                    self.stage_start_time.isoformat(),
-                    ex=3600
+                await self._apply_remote_stage(
+                    stored_stage, float(stored_started_at), int(stored_version), force=True
                 )
-            except Exception as e:
-                logger.error(f"Failed to update Redis: {e}")
+                return False
+            started_at, version = float(stored_started_at), int(stored_version)
+        elif expected and tuple(expected) != (self.current_stage, self.version):
+            return False
+        
+        self._apply_state(stage, started_at, version)
+        
+        # Cancel old timer
+        self._cancel_fallback_timer()
+        
+        await self._notify_stage_change()
         
-        logger.info(f"Stage transition: {old_stage.value} -> {stage.value}")
+        logger.info(f"Stage transition: {old_stage} -> {stage}")
         
-        # Start fallback timer for new stage
-        if stage != InterviewStage.END:
+        # Start fallback timer for new stage (precomputed per stage; none for start/end)
+        if self.graph.spec(stage).fallback_timeout and self.run_timers:
             await self._start_fallback_timer(stage)
+        return True
     
-    async def _start_fallback_timer(self, stage: InterviewStage):
-        """Start a timer that will force stage transition after timeout"""
-        stage_config = self.config.get("stages", {}).get(stage.value, {})
-        timeout = stage_config.get("fallback_timeout_seconds", 45)
+    async def _run_transition_script(self, args: list):
+        """Run the transition script, retrying once on a connection error (the CAS makes a replay safe)"""
+        try:
+            return await self._transition_script(keys=[state_key(self.room_id)], args=args)
+        except Exception as e:
+            logger.warning(f"Transition script failed, retrying once: {e}")
+            return await self._transition_script(keys=[state_key(self.room_id)], args=args)
+    
+    async def _start_fallback_timer(self, stage: str, delay: Optional[float] = None):
+        """Schedule (or move) the deadline that forces a transition after the timeout"""
+        timeout = self.graph.spec(stage).fallback_timeout
+        if delay is None:
+            delay = timeout
+        # The state the timer was armed for; it only ever advances from there
+        armed_for = (stage, self.version)
         
-        async def timer_task():
-            try:
-                await asyncio.sleep(timeout)
-                # Check if still in same stage
-                if self.current_stage == stage:
-                    logger.warning(
-                        f"Fallback timer triggered for {stage.value} after {timeout}s"
-                    )
-                    await self.transition_to_next()
-            except asyncio.CancelledError:
-                pass
+        async def on_timeout():
+            if self.version != armed_for[1]:
+                return  # overtaken locally already
+            logger.warning(
+                f"Fallback timer triggered for {stage} after {timeout}s"
+            )
+            await self._transition(self.graph.next_of, expected=armed_for)
         
-        self.stage_timers[stage.value] = asyncio.create_task(timer_task())
+        wheel = get_timer_wheel()
+        if self._fallback_timer is None:
+            self._fallback_timer = wheel.schedule(delay, on_timeout)
+        else:
+            self._fallback_timer.callback = on_timeout
+            wheel.reschedule(self._fallback_timer, delay)
     
-    async def get_current_stage(self) -> InterviewStage:
-        """Get current stage, checking Redis if available"""
-        if self.redis_client:
+    def _cancel_fallback_timer(self):
+        if self._fallback_timer:
+            self._fallback_timer.cancel()
+    
+    async def _notify_stage_change(self):
+        """Wake everything waiting for a stage change in this process"""
+        async with self._stage_changed:
+            self.stage_version += 1
+            self._stage_changed.notify_all()
+    
+    async def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Wait until the stage version moves past `version` (read stage_version
+        before inspecting the stage, then pass it here). Returns the new
+        version, or the old one if the timeout expired.
+        """
+        async with self._stage_changed:
             try:
-                stage_str = await self.redis_client.get(
-                    f"interview:{self.room_id}:stage"
+                await asyncio.wait_for(
+                    self._stage_changed.wait_for(lambda: self.stage_version != version),
+                    timeout=timeout
                 )
-                if stage_str:
-                    self.current_stage = InterviewStage(stage_str.decode() if isinstance(stage_str, bytes) else stage_str)
-            except Exception as e:
-                logger.error(f"Failed to read from Redis: {e}")
+            except asyncio.TimeoutError:
+                pass
+            return self.stage_version
+    
+    async def wait_for_stage(self, stage: str):
+        """Wait until the interview reaches the given stage"""
+        stage = stage_id(stage)
+        while True:
+            version = self.stage_version
+            if self.current_stage == stage:
+                return
+            await self.wait_for_change(version)
+    
+    async def start_listening(self):
+        """Follow stage transitions made by other processes via Redis pub/sub"""
+        if not self.redis_client or not self.room_id or self._listener_task:
+            return
+        self._listener_task = asyncio.create_task(self._listen_for_changes())
+    
+    async def _listen_for_changes(self):
+        """Apply stage events published by other StageManagers for this room"""
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(self._events_channel())
+            # Pick up anything that changed before the subscription was active
+            await self.refresh()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    event = json.loads(message["data"])
+                    if event.get("origin") == self._instance_id:
+                        continue
+                    await self._apply_remote_stage(
+                        event["stage"],
+                        float(event["started_at"]),
+                        int(event["version"])
+                    )
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Ignoring malformed stage event: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Stage event listener stopped: {e}")
+        finally:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.close()
+            except Exception:
+                pass
+    
+    async def _apply_remote_stage(self, stage: str, started_at: float, version: int, force: bool = False):
+        """
+        Adopt a transition made elsewhere. Events older than the local copy
+        are ignored unless `force` is set, which is used for state read back
+        from Redis itself. The process hosting the room's session re-arms
+        the stage's fallback timer, since the process that made the
+        transition (e.g. an API request) does not keep one.
+        """
+        if version == self.version or (version < self.version and not force):
+            return  # already seen (or older than what we have)
+        if stage not in self.graph:
+            raise ValueError(f"Unknown stage: {stage}")
+        old_stage = self.current_stage
+        self._cancel_fallback_timer()
+        self._apply_state(stage, started_at, version)
+        if stage != old_stage:
+            logger.info(f"Stage transition (remote): {old_stage} -> {stage}")
+        await self._notify_stage_change()
         
+        timeout = self.graph.spec(stage).fallback_timeout
+        if timeout and self.run_timers:
+            # Only what is left of it - the stage started when the other process moved it
+            elapsed = await self.get_stage_duration()
+            await self._start_fallback_timer(stage, delay=max(0.0, timeout - elapsed))
+    
+    async def refresh(self):
+        """Re-read the room's state hash and adopt it if its version moved"""
+        if not self.redis_client or not self.room_id:
+            return
+        try:
+            stage, started_at, version = await self.redis_client.hmget(
+                state_key(self.room_id), "stage", "started_at", "version"
+            )
+            if stage is not None and version is not None:
+                # Read straight from Redis, so it wins even if the key was reset
+                await self._apply_remote_stage(stage, float(started_at), int(version), force=True)
+        except Exception as e:
+            logger.error(f"Failed to read from Redis: {e}")
+    
+    def _is_listening(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+    
+    async def get_current_stage(self) -> str:
+        """
+        Get current stage. While the pub/sub listener is running the local
+        copy is kept current and is served without a Redis round-trip;
+        otherwise the state hash is re-read first.
+        """
+        if not self._is_listening():
+            await self.refresh()
         return self.current_stage
     
+    async def _transition(
+        self,
+        choose: Callable[[str], Optional[str]],
+        expected: Optional[tuple] = None
+    ) -> bool:
+        """
+        Decide the target from `expected` (stage, version) - the local state
+        by default - and compare-and-set it in Redis. If another process
+        moved the room first, the stored state is adopted and False is
+        returned: the decision was made for a stage that has already been
+        left, so it is not replayed against the new one.
+        """
+        current, version = expected if expected else (self.current_stage, self.version)
+        target = choose(current)
+        if target is None:
+            return False
+        return await self._set_stage(target, expected=(current, version))
+    
     async def transition_to_next(self) -> bool:
         """Transition to the next stage in the FSM"""
-        current = await self.get_current_stage()
-        
-        transitions = {
-            InterviewStage.START: InterviewStage.SELF_INTRO,
-            InterviewStage.SELF_INTRO: InterviewStage.EXPERIENCE,
-            InterviewStage.EXPERIENCE: InterviewStage.END,
-            InterviewStage.END: InterviewStage.END
-        }
-        
-        next_stage = transitions.get(current)
-        if next_stage and next_stage != current:
-            await self._set_stage(next_stage)
-            return True
-        
-        return False
+        return await self._transition(self.graph.next_of)
     
-    async def transition_to_stage(self, stage: InterviewStage) -> bool:
+    async def transition_to_stage(self, stage: str) -> bool:
         """Manually transition to a specific stage"""
-        current = await self.get_current_stage()
-        
-        # Validate transition
-        valid_transitions = {
-            InterviewStage.START: [InterviewStage.SELF_INTRO],
-            InterviewStage.SELF_INTRO: [InterviewStage.EXPERIENCE, InterviewStage.END],
-            InterviewStage.EXPERIENCE: [InterviewStage.END],
-            InterviewStage.END: []
-        }
+        stage = stage_id(stage)
         
-        if stage in valid_transitions.get(current, []):
-            await self._set_stage(stage)
-            return True
+        def choose(current: str) -> Optional[str]:
+            if self.graph.can_transition(current, stage):
+                return stage
+            logger.warning(f"Invalid transition: {current} -> {stage}")
+            return None
         
-        logger.warning(f"Invalid transition: {current.value} -> {stage.value}")
-        return False
+        return await self._transition(choose)
     
-    async def should_agent_speak(self, agent_stage: InterviewStage) -> bool:
+    async def should_agent_speak(self, agent_stage: str) -> bool:
         """Check if an agent should be speaking based on current stage"""
         current = await self.get_current_stage()
-        return current == agent_stage
+        return current == stage_id(agent_stage)
     
     async def get_stage_duration(self) -> float:
         """Get duration in seconds since stage started"""
-        if self.stage_start_time:
-            return (datetime.now() - self.stage_start_time).total_seconds()
+        if self._stage_started_mono is not None:
+            return time.monotonic() - self._stage_started_mono
         return 0.0
     
     async def check_silence_timeout(self, silence_duration: float) -> bool:
@@ -188,27 +406,36 @@ class StageManager:
     
     def get_stage(self) -> str:
         """Get current stage as string (synchronous for AgentSession)"""
-        return self.current_stage.value
+        return self.current_stage
+    
+    @property
+    def is_finished(self) -> bool:
+        """True once the interview reached the pipeline's final stage"""
+        return self.graph.is_terminal(self.current_stage)
     
     def switch_stage(self, new_stage: str):
         """Switch to a new stage (synchronous for AgentSession)"""
-        try:
-            stage = InterviewStage(new_stage)
-            asyncio.create_task(self._set_stage(stage))
-        except ValueError:
+        new_stage = stage_id(new_stage)
+        if new_stage in self.graph:
+            asyncio.create_task(self._set_stage(new_stage))
+        else:
             logger.warning(f"Invalid stage: {new_stage}")
     
+    async def close(self):
+        """Stop timers and the stage event listener, leaving Redis state intact"""
+        self._cancel_fallback_timer()
+        
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+    
     async def cleanup(self):
-        """Cleanup timers and Redis keys"""
-        for timer in self.stage_timers.values():
-            timer.cancel()
+        """Cleanup timers, the stage event listener and Redis keys"""
+        await self.close()
         
         if self.redis_client and self.room_id:
             try:
-                await self.redis_client.delete(
-                    f"interview:{self.room_id}:stage",
-                    f"interview:{self.room_id}:stage_start"
-                )
+                await self.redis_client.delete(state_key(self.room_id))
             except Exception as e:
                 logger.error(f"Failed to cleanup Redis: {e}")
 
@@ -0,0 +1,170 @@
+"""
+Timer Wheel - Process-wide hashed timer wheel for stage deadlines
+One ticking task per event loop owns every scheduled deadline, instead of one
+sleeping task per session per stage. Schedule, cancel and reschedule are O(1);
+each timer fires at most once.
+"""
+
+import asyncio
+import logging
+import math
+import time
+import weakref
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Metrics
+TIMER_WHEEL_PENDING = Gauge(
+    "timer_wheel_pending", "Deadlines scheduled on the worker's timer wheels", multiprocess_mode="livesum"
+)
+
+TimerCallback = Callable[[], Optional[Awaitable[Any]]]
+
+
+class TimerHandle:
+    """A scheduled deadline; cancel() or reschedule via TimerWheel.reschedule()"""
+
+    __slots__ = ("callback", "deadline", "_wheel", "_slot", "_rounds", "cancelled", "fired")
+
+    def __init__(self, wheel: "TimerWheel", callback: TimerCallback):
+        self.callback = callback
+        self.deadline = 0.0
+        self._wheel = wheel
+        self._slot: Optional[int] = None
+        self._rounds = 0
+        self.cancelled = False
+        self.fired = False
+
+    @property
+    def active(self) -> bool:
+        return self._slot is not None
+
+    def cancel(self):
+        """Stop the timer from firing (no-op if it already fired)"""
+        self.cancelled = True
+        self._wheel._remove(self)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic()) if self.active else 0.0
+
+
+class TimerWheel:
+    """Hashed timer wheel driven by a single asyncio task"""
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots: List[Set[TimerHandle]] = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+        self._ticks = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, delay: float, callback: TimerCallback) -> TimerHandle:
+        """Run `callback` (sync or async) once, `delay` seconds from now"""
+        handle = TimerHandle(self, callback)
+        self._insert(handle, delay)
+        return handle
+
+    def reschedule(self, handle: TimerHandle, delay: float) -> TimerHandle:
+        """Move a pending (or cancelled/fired) timer to `delay` seconds from now"""
+        self._remove(handle)
+        handle.cancelled = False
+        handle.fired = False
+        self._insert(handle, delay)
+        return handle
+
+    def _insert(self, handle: TimerHandle, delay: float):
+        self._ensure_running()
+        # Ticks from the wheel's current position; the pending tick counts as one
+        elapsed_in_tick = time.monotonic() - (self._started_at + self._ticks * self.tick)
+        ticks = max(1, math.ceil((max(0.0, delay) + elapsed_in_tick) / self.tick))
+        slot = (self._cursor + ticks) % len(self.slots)
+        handle._rounds = (ticks - 1) // len(self.slots)
+        handle._slot = slot
+        handle.deadline = time.monotonic() + delay
+        self.slots[slot].add(handle)
+        self._count += 1
+        TIMER_WHEEL_PENDING.inc()
+
+    def _remove(self, handle: TimerHandle):
+        if handle._slot is None:
+            return
+        self.slots[handle._slot].discard(handle)
+        handle._slot = None
+        self._count -= 1
+        TIMER_WHEEL_PENDING.dec()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._started_at = time.monotonic()
+            self._ticks = 0
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        """Advance one slot per tick (catching up if the loop lagged); exit when idle"""
+        try:
+            while self._count:
+                next_tick = self._started_at + (self._ticks + 1) * self.tick
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+                while time.monotonic() >= self._started_at + (self._ticks + 1) * self.tick:
+                    self._ticks += 1
+                    self._cursor = (self._cursor + 1) % len(self.slots)
+                    self._expire(self.slots[self._cursor])
+        except asyncio.CancelledError:
+            pass
+
+    def _expire(self, slot: Set[TimerHandle]):
+        due = []
+        for handle in slot:
+            if handle._rounds > 0:
+                handle._rounds -= 1
+            else:
+                due.append(handle)
+        for handle in due:
+            self._remove(handle)
+            handle.fired = True
+            self._fire(handle)
+
+    def _fire(self, handle: TimerHandle):
+        try:
+            result = handle.callback()
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                task.add_done_callback(_log_callback_error)
+        except Exception as e:
+            logger.error(f"Timer callback failed: {e}", exc_info=True)
+
+    def close(self):
+        """Cancel every pending timer and stop ticking"""
+        for slot in self.slots:
+            for handle in list(slot):
+                handle.cancel()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+def _log_callback_error(task: asyncio.Future):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Timer callback failed: {task.exception()}", exc_info=task.exception())
+
+
+# One wheel per event loop (a worker process runs one loop)
+_wheels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = weakref.WeakKeyDictionary()
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Get (or lazily create) the timer wheel for the running event loop"""
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = TimerWheel()
+        _wheels[loop] = wheel
+    return wheel
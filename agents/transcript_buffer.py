@@ -0,0 +1,146 @@
+"""
+Transcript Buffer - Write-behind, pipelined transcript persistence
+Utterances are queued in memory and flushed to Redis in batches by a
+background task, so Redis latency never sits in the speech path.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional
+import redis.asyncio as redis
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Metrics
+TRANSCRIPT_DROPPED = Counter(
+    "transcript_entries_dropped_total", "Transcript entries dropped because Redis fell behind"
+)
+TRANSCRIPT_FLUSHED = Counter(
+    "transcript_entries_flushed_total", "Transcript entries written to Redis"
+)
+TRANSCRIPT_FLUSH_SECONDS = Histogram(
+    "transcript_flush_seconds", "Time taken by one pipelined transcript flush"
+)
+
+
+class TranscriptBuffer:
+    """Per-session write-behind buffer for the Redis transcript list"""
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        room_id: str,
+        flush_interval: float = 0.5,
+        max_batch: int = 20,
+        max_pending: int = 500,
+        ttl_seconds: int = 86400
+    ):
+        self.redis_client = redis_client
+        self.key = f"interview:{room_id}:transcript"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.dropped = 0
+        self._pending: Deque[str] = deque()
+        self._ttl_applied = False
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def add(self, role: str, content: str) -> bool:
+        """Queue an utterance; never waits on Redis. Returns False if dropped."""
+        if self._closed:
+            return False
+        if len(self._pending) >= self.max_pending:
+            # Redis is not keeping up - shed load rather than stall the conversation
+            self.dropped += 1
+            TRANSCRIPT_DROPPED.inc()
+            logger.warning(f"Transcript buffer full, dropped entry for {self.key} ({self.dropped} total)")
+            return False
+
+        self._pending.append(json.dumps({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        }))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+        return True
+
+    async def _run(self):
+        """Flush on the interval, or early when a full batch is waiting, until closed"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything pending in one pipelined round-trip per batch"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                started = time.monotonic()
+                try:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.rpush(self.key, *batch)
+                    if not self._ttl_applied:
+                        pipe.expire(self.key, self.ttl_seconds)
+                    await pipe.execute()
+                    self._ttl_applied = True
+                    TRANSCRIPT_FLUSHED.inc(len(batch))
+                except asyncio.CancelledError:
+                    # Not known to be written - keep it for whoever flushes next
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                except Exception as e:
+                    logger.error(f"Error flushing transcript: {e}")
+                    # Put the batch back (oldest first) as far as the buffer allows
+                    room = self.max_pending - len(self._pending)
+                    keep = batch[:max(0, room)]
+                    self._pending.extendleft(reversed(keep))
+                    lost = len(batch) - len(keep)
+                    if lost:
+                        self.dropped += lost
+                        TRANSCRIPT_DROPPED.inc(lost)
+                    return
+                finally:
+                    TRANSCRIPT_FLUSH_SECONDS.observe(time.monotonic() - started)
+
+    async def aclose(self, timeout: float = 5.0):
+        """
+        Stop accepting entries and let the flusher write out everything still
+        pending, waiting at most `timeout` seconds. Entries that could not be
+        written by then are counted as dropped.
+        """
+        self._closed = True
+        self._wake.set()
+        if self._task:
+            _, pending = await asyncio.wait({self._task}, timeout=timeout)
+            if pending:
+                logger.warning(f"Transcript flush for {self.key} did not finish within {timeout}s")
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+
+        if self._pending:
+            lost = len(self._pending)
+            self._pending.clear()
+            self.dropped += lost
+            TRANSCRIPT_DROPPED.inc(lost)
+            logger.error(f"Lost {lost} transcript entries for {self.key} on close")
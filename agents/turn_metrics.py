@@ -0,0 +1,194 @@
+"""
+Turn Metrics - Per-turn conversational latency, tagged by interview stage
+Every turn is timed from the end of the candidate's speech to each pipeline
+milestone: STT final transcript, LLM first token, TTS first audio and playout
+start. Observations go to an in-process histogram and, optionally, to a
+Redis-backed histogram shared by all workers so the API can expose
+cluster-wide percentiles.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+import redis.asyncio as redis
+from prometheus_client import CollectorRegistry, Histogram, generate_latest
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.utils import floatToGoString
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("stt_final", "llm_first_token", "tts_first_audio", "playout_start")
+
+TURN_LATENCY_BUCKETS = (0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+# Metrics
+TURN_LATENCY = Histogram(
+    "turn_latency_seconds",
+    "Time from end of user speech to each turn milestone",
+    labelnames=("stage", "phase"),
+    buckets=TURN_LATENCY_BUCKETS
+)
+
+# Cluster-wide histogram (hash fields: "stage|phase|le", "stage|phase|sum", "stage|phase|count")
+SHARED_HISTOGRAM_KEY = "metrics:turn_latency"
+SHARED_METRIC_NAME = "interview_turn_latency_seconds"
+
+
+class SharedTurnLatency:
+    """Write-behind sink that folds turn observations into the shared Redis histogram"""
+
+    def __init__(self, redis_client: redis.Redis, flush_interval: float = 5.0):
+        self.redis_client = redis_client
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, str, float]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, stage: str, phase: str, value: float):
+        self._pending.append((stage, phase, value))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Write everything pending in one pipelined round-trip"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for stage, phase, value in pending:
+                prefix = f"{stage}|{phase}"
+                bucket = next((b for b in TURN_LATENCY_BUCKETS if value <= b), float("inf"))
+                pipe.hincrby(SHARED_HISTOGRAM_KEY, f"{prefix}|{floatToGoString(bucket)}", 1)
+                pipe.hincrbyfloat(SHARED_HISTOGRAM_KEY, f"{prefix}|sum", value)
+                pipe.hincrby(SHARED_HISTOGRAM_KEY, f"{prefix}|count", 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not publish turn latency metrics: {e}")
+
+
+async def render_shared_turn_latency(redis_client: redis.Redis) -> str:
+    """Prometheus text for the cluster-wide turn latency histogram"""
+    fields: Dict[str, str] = await redis_client.hgetall(SHARED_HISTOGRAM_KEY)
+    series: Dict[Tuple[str, str], Dict[str, float]] = {}
+    for field, value in fields.items():
+        stage, phase, suffix = field.rsplit("|", 2)
+        series.setdefault((stage, phase), {})[suffix] = float(value)
+
+    family = HistogramMetricFamily(
+        SHARED_METRIC_NAME,
+        "Time from end of user speech to each turn milestone, all workers",
+        labels=("stage", "phase")
+    )
+    for (stage, phase), values in sorted(series.items()):
+        cumulative = 0.0
+        buckets = []
+        for bound in TURN_LATENCY_BUCKETS + (float("inf"),):
+            cumulative += values.get(floatToGoString(bound), 0.0)
+            buckets.append((floatToGoString(bound), cumulative))
+        family.add_metric([stage, phase], buckets, values.get("sum", 0.0))
+
+    registry = CollectorRegistry()
+    registry.register(_StaticCollector(family))
+    return generate_latest(registry).decode()
+
+
+class _StaticCollector:
+    """Collector exposing an already-built metric family"""
+
+    def __init__(self, family: HistogramMetricFamily):
+        self.family = family
+
+    def collect(self):
+        yield self.family
+
+
+class TurnTimer:
+    """Timeline of one conversational turn; each phase is recorded at most once"""
+
+    __slots__ = ("stage", "started_at", "sink", "_seen")
+
+    def __init__(self, stage: str, started_at: Optional[float] = None, sink: Optional[SharedTurnLatency] = None):
+        self.stage = stage
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self.sink = sink
+        self._seen = set()
+
+    def mark(self, phase: str) -> Optional[float]:
+        """Record that a phase was reached now"""
+        return self.observe(phase, time.monotonic() - self.started_at)
+
+    def observe(self, phase: str, elapsed: float) -> Optional[float]:
+        """Record a phase's latency measured elsewhere (e.g. from SDK metrics)"""
+        if phase in self._seen or elapsed < 0:
+            return None
+        self._seen.add(phase)
+        TURN_LATENCY.labels(stage=self.stage, phase=phase).observe(elapsed)
+        if self.sink:
+            self.sink.record(self.stage, phase, elapsed)
+        return elapsed
+
+
+async def time_first_chunk(
+    chunks: AsyncIterable[str],
+    turn: Optional[TurnTimer],
+    phase: str = "llm_first_token"
+) -> AsyncGenerator[str, None]:
+    """Pass a token stream through, marking the phase when the first chunk arrives"""
+    async for chunk in chunks:
+        if turn:
+            turn.mark(phase)
+        yield chunk
+
+
+class SessionTurnTracker:
+    """
+    Times turns of a LiveKit AgentSession from its events.
+    STT and LLM phases come from the SDK's EOU/LLM metrics (measured from the
+    end of speech and from the LLM request, which starts at end of turn);
+    TTS first audio adds the TTS time-to-first-byte to that, so it ignores
+    sentence buffering; playout start is timed directly from the agent
+    state change.
+    """
+
+    def __init__(self, session: Any, stage_fn: Callable[[], str], sink: Optional[SharedTurnLatency] = None):
+        self.session = session
+        self.stage_fn = stage_fn
+        self.sink = sink
+        self.turn: Optional[TurnTimer] = None
+        self._llm_request_offset: Optional[float] = None
+        self._llm_first_token: Optional[float] = None
+
+    def attach(self):
+        self.session.on("user_state_changed", self._on_user_state_changed)
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+        self.session.on("metrics_collected", self._on_metrics_collected)
+
+    def _on_user_state_changed(self, event: Any):
+        if getattr(event, "old_state", None) == "speaking" and getattr(event, "new_state", None) != "speaking":
+            self.turn = TurnTimer(self.stage_fn(), sink=self.sink)
+            self._llm_request_offset = None
+            self._llm_first_token = None
+
+    def _on_agent_state_changed(self, event: Any):
+        if self.turn and getattr(event, "new_state", None) == "speaking":
+            self.turn.mark("playout_start")
+
+    def _on_metrics_collected(self, event: Any):
+        turn = self.turn
+        metrics = getattr(event, "metrics", None)
+        if turn is None or metrics is None:
+            return
+        kind = getattr(metrics, "type", "")
+        if kind == "eou_metrics":
+            turn.observe("stt_final", metrics.transcription_delay)
+            self._llm_request_offset = metrics.end_of_utterance_delay
+        elif kind == "llm_metrics" and self._llm_request_offset is not None:
+            self._llm_first_token = self._llm_request_offset + metrics.ttft
+            turn.observe("llm_first_token", self._llm_first_token)
+        elif kind == "tts_metrics" and self._llm_first_token is not None:
+            turn.observe("tts_first_audio", self._llm_first_token + metrics.ttfb)
@@ -0,0 +1,124 @@
+"""
+Worker Resources - Loads heavy, shareable resources once per worker process
+The prewarm hook runs when the AgentServer starts a job process; each job then
+only creates lightweight per-session handles on top of these.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional, Any
+import redis.asyncio as redis
+from livekit.agents import JobContext, JobProcess
+from livekit.plugins import silero
+from livekit.plugins.openai import LLM as OpenAILLM
+
+from .audio_cache import AudioFrameCache
+from .config import Settings, get_settings
+from .metrics_server import mark_process_dead_at_exit
+from .turn_metrics import SharedTurnLatency
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def redis_url_from_env() -> str:
+    """Build the Redis URL from environment variables (set by docker-compose)"""
+    redis_host = os.getenv("REDIS_HOST", "redis")
+    redis_port = int(os.getenv("REDIS_PORT", "6379"))
+    redis_db = int(os.getenv("REDIS_DB", "0"))
+    redis_password = os.getenv("REDIS_PASSWORD", "")
+
+    if redis_password:
+        return f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
+    return f"redis://{redis_host}:{redis_port}/{redis_db}"
+
+
+class WorkerResources:
+    """Process-wide resources shared by every job this worker process runs"""
+
+    def __init__(
+        self,
+        vad: Any,
+        redis_client: redis.Redis,
+        llm: Optional[OpenAILLM],
+        audio_cache: AudioFrameCache,
+        turn_latency: SharedTurnLatency
+    ):
+        self.vad = vad
+        self.redis_client = redis_client
+        self.llm = llm
+        self.audio_cache = audio_cache
+        self.turn_latency = turn_latency
+    
+    @property
+    def config(self) -> Settings:
+        """Current settings (new jobs pick up hot-reloaded values)"""
+        return get_settings()
+
+
+def prewarm(proc: JobProcess):
+    """AgentServer setup hook: load VAD, config and shared clients once per process"""
+    timings = {}
+
+    start = time.perf_counter()
+    config = get_settings()
+    timings["config"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vad = silero.VAD.load()
+    timings["vad"] = time.perf_counter() - start
+
+    # The pool opens connections lazily, so this is cheap until first use
+    start = time.perf_counter()
+    redis_client = redis.from_url(
+        redis_url_from_env(),
+        decode_responses=True,
+        max_connections=config.get("redis", {}).get("max_connections", 50)
+    )
+    timings["redis"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    llm = None
+    if os.getenv("OPENAI_API_KEY"):
+        llm = OpenAILLM(model=config.get("llm", {}).get("model", "gpt-4o-mini"))
+    else:
+        logger.error("OPENAI_API_KEY is not set - jobs in this process will fail to start")
+    timings["llm"] = time.perf_counter() - start
+
+    # Pre-synthesized fixed utterances persisted by earlier processes
+    start = time.perf_counter()
+    cache_dir = PROJECT_ROOT / config.get("audio", {}).get("tts_cache_dir", "cache/tts")
+    audio_cache = AudioFrameCache(cache_dir)
+    cached = audio_cache.load_from_disk()
+    timings["audio_cache"] = time.perf_counter() - start
+    logger.info(f"Loaded {cached} cached TTS utterances from {cache_dir}")
+
+    # Metrics go to the worker's multiprocess directory (served by the main
+    # process), plus the histogram shared through Redis
+    start = time.perf_counter()
+    metrics_config = config.get("metrics", {})
+    mark_process_dead_at_exit()
+    turn_latency = SharedTurnLatency(
+        redis_client, flush_interval=metrics_config.get("flush_interval_seconds", 5.0)
+    )
+    timings["metrics"] = time.perf_counter() - start
+
+    proc.userdata["resources"] = WorkerResources(
+        vad, redis_client, llm, audio_cache, turn_latency
+    )
+
+    breakdown = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+    logger.info(f"🔥 Worker prewarm finished in {sum(timings.values()) * 1000:.0f}ms ({breakdown})")
+
+
+def get_worker_resources(ctx: JobContext) -> WorkerResources:
+    """Get this process's shared resources, prewarming now if the hook has not run"""
+    resources = ctx.proc.userdata.get("resources")
+    if resources is None:
+        logger.warning("Worker was not prewarmed, loading resources for this job")
+        prewarm(ctx.proc)
+        resources = ctx.proc.userdata["resources"]
+    return resources
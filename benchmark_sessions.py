@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark how many interview sessions one CPU core can carry
+Runs N simulated sessions in one process - each a Silero VAD stream fed 20 ms
+audio frames in real time, like a live candidate - and measures event-loop
+lag and CPU use. N is increased until lag or CPU goes past the limits; the
+last passing N is the safe sessions-per-core figure for worker.max_sessions.
+
+Usage: python benchmark_sessions.py [--max-sessions 32] [--duration 20]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+from livekit import rtc
+from livekit.plugins import silero
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+SAMPLES_PER_FRAME = SAMPLE_RATE * FRAME_MS // 1000
+
+
+def make_audio(seconds: float) -> list:
+    """Alternating bursts of noise and silence, so VAD sees speech start/stop"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(int(seconds * 1000 / FRAME_MS)):
+        talking = (i // 100) % 2 == 0  # 2 s on, 2 s off
+        amplitude = 6000 if talking else 50
+        samples = (rng.standard_normal(SAMPLES_PER_FRAME) * amplitude).astype(np.int16)
+        frames.append(rtc.AudioFrame(
+            data=samples.tobytes(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            samples_per_channel=SAMPLES_PER_FRAME,
+        ))
+    return frames
+
+
+async def run_session(vad, frames: list, stop: asyncio.Event):
+    """Feed one VAD stream in real time and drain its events"""
+    stream = vad.stream()
+
+    async def drain():
+        async for _ in stream:
+            pass
+
+    drain_task = asyncio.create_task(drain())
+    next_tick = time.monotonic()
+    i = 0
+    while not stop.is_set():
+        stream.push_frame(frames[i % len(frames)])
+        i += 1
+        next_tick += FRAME_MS / 1000
+        await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+    stream.end_input()
+    await stream.aclose()
+    drain_task.cancel()
+
+
+async def measure_lag(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Record how late a fixed-interval timer fires"""
+    while not stop.is_set():
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        samples.append(time.monotonic() - start - interval)
+
+
+async def run_level(vad, frames: list, sessions: int, duration: float) -> dict:
+    stop = asyncio.Event()
+    lag_samples = []
+    tasks = [asyncio.create_task(run_session(vad, frames, stop)) for _ in range(sessions)]
+    lag_task = asyncio.create_task(measure_lag(stop, lag_samples))
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    await asyncio.sleep(duration)
+    cpu = (time.process_time() - cpu_start) / (time.monotonic() - wall_start)
+
+    stop.set()
+    await asyncio.gather(*tasks, lag_task, return_exceptions=True)
+
+    lags = sorted(lag_samples) or [0.0]
+    return {
+        "sessions": sessions,
+        "cpu": cpu,
+        "lag_p50_ms": lags[len(lags) // 2] * 1000,
+        "lag_p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+    }
+
+
+async def main(args):
+    print("=" * 60)
+    print("📈 Sessions-per-core benchmark")
+    print("=" * 60)
+    print(f"   Limits: loop lag p99 <= {args.max_lag_ms:.0f}ms, CPU <= {args.max_cpu:.0%} of one core")
+    print()
+
+    vad = silero.VAD.load()
+    frames = make_audio(8.0)
+
+    safe = 0
+    sessions = 1
+    while sessions <= args.max_sessions:
+        result = await run_level(vad, frames, sessions, args.duration)
+        ok = result["lag_p99_ms"] <= args.max_lag_ms and result["cpu"] <= args.max_cpu
+        print(
+            f"   {'✅' if ok else '❌'} {sessions:3d} sessions: "
+            f"CPU {result['cpu']:.0%}, lag p50 {result['lag_p50_ms']:.1f}ms, p99 {result['lag_p99_ms']:.1f}ms"
+        )
+        if not ok:
+            break
+        safe = sessions
+        sessions = sessions * 2 if sessions < 4 else sessions + 2
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    print()
+    print(f"Safe sessions per core: {safe}")
+    print(f"Suggested worker.max_sessions on this host ({cores} cores): {safe * cores}")
+    print("(Excludes STT/TTS/LLM network time; leave headroom with worker.load_threshold.)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-sessions", type=int, default=32, help="stop after this many sessions")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run each level")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0, help="acceptable p99 event-loop lag")
+    parser.add_argument("--max-cpu", type=float, default=0.7, help="acceptable CPU fraction of one core")
+    asyncio.run(main(parser.parse_args()))
@@ -6,7 +6,7 @@ if [ -z "$1" ]; then
     echo "Usage: ./get_transcript.sh <room_id>"
     echo ""
     echo "Available rooms:"
-    docker-compose exec redis redis-cli KEYS "interview:*:stage" 2>/dev/null | sed 's/interview://' | sed 's/:stage//' | head -10
+    docker-compose exec redis redis-cli KEYS "interview:*:state" 2>/dev/null | sed 's/interview://' | sed 's/:state//' | head -10
     exit 1
 fi
 
@@ -4,16 +4,22 @@ FastAPI Server - REST API for managing interview sessions
 
 import logging
 import os
-from typing import Optional, Dict, Any
+from typing import Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from pydantic import BaseModel
 import redis.asyncio as redis
 from datetime import datetime
-import yaml
 from pathlib import Path
 
-from agents.stage_manager import StageManager, InterviewStage
+from agents.config import get_settings
+from agents.stage_graph import get_stage_graph
+from agents.stage_manager import StageManager
+from agents.turn_metrics import render_shared_turn_latency
+from server.session_registry import SessionRegistry
+from server.status_reader import read_stage_status
 
 # LiveKit API for agent dispatch
 try:
@@ -39,7 +45,14 @@ app.add_middleware(
 
 # Global Redis client
 redis_client: Optional[redis.Redis] = None
-active_sessions: Dict[str, StageManager] = {}
+
+# StageManagers for rooms this process is driving, bounded and idle-evicted
+_registry_config = get_settings().section("server").get("session_registry", {})
+sessions = SessionRegistry(
+    max_sessions=_registry_config.get("max_sessions", 1000),
+    idle_ttl_seconds=_registry_config.get("idle_ttl_seconds", 3600),
+    sweep_interval_seconds=_registry_config.get("sweep_interval_seconds", 60)
+)
 
 
 class InterviewStartRequest(BaseModel):
@@ -61,10 +74,28 @@ class InterviewStopResponse(BaseModel):
     final_stage: str
 
 
+async def get_session(room_id: str) -> Optional[StageManager]:
+    """
+    StageManager for a room, re-attached from Redis if it was evicted from
+    the registry (or started by another API process). None if the room has
+    no state.
+    """
+    stage_manager = sessions.get(room_id)
+    if stage_manager or not redis_client:
+        return stage_manager
+    
+    stage_manager = StageManager(redis_client=redis_client, run_timers=False)
+    if not await stage_manager.attach(room_id):
+        return None
+    sessions.put(room_id, stage_manager)
+    return stage_manager
+
+
 @app.on_event("startup")
 async def startup():
     """Initialize Redis connection on startup"""
     global redis_client
+    sessions.start()
     try:
         import os
         # Use environment variables first (set by docker-compose), then defaults
@@ -90,6 +121,7 @@ async def startup():
 async def shutdown():
     """Cleanup on shutdown"""
     global redis_client
+    await sessions.close()
     if redis_client:
         await redis_client.close()
     logger.info("Shutdown complete")
@@ -101,23 +133,36 @@ async def health_check():
     return {
         "status": "healthy",
         "redis_connected": redis_client is not None and await redis_client.ping() if redis_client else False,
-        "active_sessions": len(active_sessions)
+        "active_sessions": len(sessions)
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: this process's registry plus turn latency from all workers"""
+    body = generate_latest(REGISTRY).decode()
+    if redis_client:
+        try:
+            body += await render_shared_turn_latency(redis_client)
+        except Exception as e:
+            logger.warning(f"Could not read shared turn latency metrics: {e}")
+    return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/interview/start")
 async def start_interview(request: InterviewStartRequest):
     """Start a new interview session"""
     try:
-        # Initialize stage manager
-        stage_manager = StageManager(redis_client=redis_client)
+        # Initialize stage manager; with Redis, the agent hosting the room
+        # runs the stage deadlines and this process only drives transitions
+        stage_manager = StageManager(redis_client=redis_client, run_timers=redis_client is None)
         await stage_manager.initialize(request.room_id)
         
         # Transition to self-intro stage
         await stage_manager.transition_to_next()
         
         # Store in active sessions
-        active_sessions[request.room_id] = stage_manager
+        sessions.put(request.room_id, stage_manager)
         
         # Store metadata
         if redis_client:
@@ -129,7 +174,7 @@ async def start_interview(request: InterviewStartRequest):
         
         return {
             "room_id": request.room_id,
-            "stage": "self_intro",
+            "stage": stage_manager.get_stage(),
             "message": "Interview started",
             "status": "active"
         }
@@ -140,38 +185,32 @@ async def start_interview(request: InterviewStartRequest):
 
 @app.get("/interview/{room_id}/status")
 async def get_interview_status(room_id: str):
-    """Get current status of an interview"""
+    """Get current status of an interview (read-only, one Redis round-trip)"""
     try:
-        stage_manager = active_sessions.get(room_id)
-        
-        if not stage_manager:
-            # Try to load from Redis
-            if redis_client:
-                stage_str = await redis_client.get(f"interview:{room_id}:stage")
-                if not stage_str:
-                    raise HTTPException(status_code=404, detail="Interview not found")
-                
-                stage_manager = StageManager(redis_client=redis_client)
-                await stage_manager.initialize(room_id)
-                active_sessions[room_id] = stage_manager
-            else:
-                raise HTTPException(status_code=404, detail="Interview not found")
+        graph = get_stage_graph(get_settings())
         
-        current_stage = await stage_manager.get_current_stage()
-        stage_duration = await stage_manager.get_stage_duration()
-        
-        stage_start_time = None
         if redis_client:
-            stage_start_str = await redis_client.get(f"interview:{room_id}:stage_start")
-            if stage_start_str:
-                stage_start_time = stage_start_str
+            status = await read_stage_status(redis_client, room_id)
+            if status is None:
+                raise HTTPException(status_code=404, detail="Interview not found")
+            return InterviewStatusResponse(
+                room_id=room_id,
+                stage=status.stage,
+                stage_start_time=status.started_at_iso,
+                stage_duration=status.duration,
+                status="completed" if graph.is_terminal(status.stage) else "active"
+            )
         
+        # Without Redis only sessions started by this process are known
+        stage_manager = sessions.get(room_id)
+        if not stage_manager:
+            raise HTTPException(status_code=404, detail="Interview not found")
         return InterviewStatusResponse(
             room_id=room_id,
-            stage=current_stage.value,
-            stage_start_time=stage_start_time,
-            stage_duration=stage_duration,
-            status="active" if current_stage != InterviewStage.END else "completed"
+            stage=stage_manager.get_stage(),
+            stage_start_time=stage_manager.stage_start_time.isoformat() if stage_manager.stage_start_time else None,
+            stage_duration=await stage_manager.get_stage_duration(),
+            status="completed" if stage_manager.is_finished else "active"
         )
     except HTTPException:
         raise
@@ -184,20 +223,18 @@ async def get_interview_status(room_id: str):
 async def transition_stage(room_id: str, target_stage: Optional[str] = None):
     """Manually transition to next stage or specific stage"""
     try:
-        stage_manager = active_sessions.get(room_id)
+        stage_manager = await get_session(room_id)
         
         if not stage_manager:
             raise HTTPException(status_code=404, detail="Interview not found")
         
         if target_stage:
             # Transition to specific stage
-            try:
-                target = InterviewStage(target_stage)
-                success = await stage_manager.transition_to_stage(target)
-                if not success:
-                    raise HTTPException(status_code=400, detail="Invalid stage transition")
-            except ValueError:
+            if target_stage not in stage_manager.graph:
                 raise HTTPException(status_code=400, detail=f"Invalid stage: {target_stage}")
+            success = await stage_manager.transition_to_stage(target_stage)
+            if not success:
+                raise HTTPException(status_code=400, detail="Invalid stage transition")
         else:
             # Transition to next stage
             success = await stage_manager.transition_to_next()
@@ -208,7 +245,7 @@ async def transition_stage(room_id: str, target_stage: Optional[str] = None):
         
         return {
             "room_id": room_id,
-            "stage": current_stage.value,
+            "stage": current_stage,
             "message": "Stage transitioned successfully"
         }
     except HTTPException:
@@ -222,24 +259,23 @@ async def transition_stage(room_id: str, target_stage: Optional[str] = None):
 async def stop_interview(room_id: str):
     """Stop an interview session"""
     try:
-        stage_manager = active_sessions.get(room_id)
+        stage_manager = await get_session(room_id)
         
         if not stage_manager:
             raise HTTPException(status_code=404, detail="Interview not found")
         
         # Transition to END stage
-        await stage_manager.transition_to_stage(InterviewStage.END)
+        await stage_manager.transition_to_stage(stage_manager.graph.terminal)
         current_stage = await stage_manager.get_current_stage()
         
         # Cleanup
+        sessions.pop(room_id)
         await stage_manager.cleanup()
-        if room_id in active_sessions:
-            del active_sessions[room_id]
         
         return InterviewStopResponse(
             room_id=room_id,
             message="Interview stopped",
-            final_stage=current_stage.value
+            final_stage=current_stage
         )
     except HTTPException:
         raise
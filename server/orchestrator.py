@@ -4,7 +4,7 @@ Orchestrator - Main entry point that manages both agents in a LiveKit room
 
 import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Dict
 from livekit import agents, rtc
 from livekit.agents import (
     AutoSubscribe,
@@ -14,19 +14,16 @@ from livekit.agents import (
 )
 from livekit.agents.pipeline import VoicePipelineAgent
 
-from agents.stage_manager import StageManager, InterviewStage
+from agents.config import get_settings
+from agents.stage_manager import StageManager
 from agents.llm_client import LLMClient
-from agents.self_intro_agent import SelfIntroAgent
-from agents.experience_agent import ExperienceAgent
 import redis.asyncio as redis
-from pathlib import Path
-import yaml
 
 logger = logging.getLogger(__name__)
 
 
 class InterviewOrchestrator:
-    """Orchestrates both agents in the interview"""
+    """Orchestrates the per-stage agents configured in the stage pipeline"""
     
     def __init__(
         self,
@@ -37,22 +34,19 @@ class InterviewOrchestrator:
         self.room = room
         self.stage_manager = stage_manager
         self.llm_client = llm_client
-        self.self_intro_agent: Optional[SelfIntroAgent] = None
-        self.experience_agent: Optional[ExperienceAgent] = None
+        self.agents: Dict[str, VoicePipelineAgent] = {}
         self.current_agent: Optional[VoicePipelineAgent] = None
         
     async def initialize(self):
-        """Initialize both agents"""
-        # Create both agents
-        self.self_intro_agent = SelfIntroAgent(
-            stage_manager=self.stage_manager,
-            llm_client=self.llm_client
-        )
-        
-        self.experience_agent = ExperienceAgent(
-            stage_manager=self.stage_manager,
-            llm_client=self.llm_client
-        )
+        """Create the agent of every stage that has one configured"""
+        graph = self.stage_manager.graph
+        for stage in graph.order:
+            agent_class = graph.agent_class(stage)
+            if agent_class:
+                self.agents[stage] = agent_class(
+                    stage_manager=self.stage_manager,
+                    llm_client=self.llm_client
+                )
         
         # Start monitoring stage changes
         asyncio.create_task(self._monitor_stage_changes())
@@ -65,10 +59,12 @@ class InterviewOrchestrator:
         
         while True:
             try:
-                current_stage = await self.stage_manager.get_current_stage()
+                # Read the version first so a change during handling is not missed
+                version = self.stage_manager.stage_version
+                current_stage = self.stage_manager.current_stage
                 
                 if current_stage != last_stage:
-                    logger.info(f"Stage changed to: {current_stage.value}")
+                    logger.info(f"Stage changed to: {current_stage}")
                     
                     # Stop current agent
                     if self.current_agent:
@@ -78,21 +74,17 @@ class InterviewOrchestrator:
                             logger.error(f"Error closing agent: {e}")
                     
                     # Activate appropriate agent
-                    if current_stage == InterviewStage.SELF_INTRO:
-                        self.current_agent = self.self_intro_agent
-                        self.current_agent.start(self.room)
-                        logger.info("Self-intro agent activated")
-                    elif current_stage == InterviewStage.EXPERIENCE:
-                        self.current_agent = self.experience_agent
+                    self.current_agent = self.agents.get(current_stage)
+                    if self.current_agent:
                         self.current_agent.start(self.room)
-                        logger.info("Experience agent activated")
-                    elif current_stage == InterviewStage.END:
+                        logger.info(f"{type(self.current_agent).__name__} activated for {current_stage}")
+                    elif self.stage_manager.is_finished:
                         logger.info("Interview ended")
                         break
                     
                     last_stage = current_stage
                 
-                await asyncio.sleep(0.5)  # Check every 500ms
+                await self.stage_manager.wait_for_change(version)
                 
             except Exception as e:
                 logger.error(f"Error in stage monitor: {e}")
@@ -113,10 +105,8 @@ async def entrypoint(ctx: JobContext):
     
     logger.info(f"Starting interview orchestrator for room: {ctx.room.sid}")
     
-    # Load configuration
-    config_path = Path(__file__).parent.parent / "config" / "settings.yaml"
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    # Shared settings (placeholders already expanded from the environment)
+    config = get_settings()
     
     # Connect to Redis
     redis_config = config.get("redis", {})
@@ -128,11 +118,12 @@ async def entrypoint(ctx: JobContext):
     redis_client = redis.from_url(redis_url, decode_responses=True)
     
     # Initialize stage manager
-    stage_manager = StageManager(redis_client=redis_client, config_path=config_path)
+    stage_manager = StageManager(redis_client=redis_client, config=config)
     await stage_manager.initialize(ctx.room.sid)
+    await stage_manager.start_listening()
     
     # Initialize LLM client
-    llm_client = LLMClient(config_path=config_path)
+    llm_client = LLMClient(redis_client=redis_client)
     
     # Create orchestrator
     orchestrator = InterviewOrchestrator(
@@ -145,11 +136,7 @@ async def entrypoint(ctx: JobContext):
     
     # Wait for interview to complete
     try:
-        while True:
-            current_stage = await stage_manager.get_current_stage()
-            if current_stage == InterviewStage.END:
-                break
-            await asyncio.sleep(1)
+        await stage_manager.wait_for_stage(stage_manager.graph.terminal)
     except KeyboardInterrupt:
         logger.info("Orchestrator interrupted")
     finally:
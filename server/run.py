@@ -4,8 +4,8 @@ Run script for FastAPI server
 
 import uvicorn
 import logging
-from pathlib import Path
-import yaml
+
+from agents.config import get_settings
 
 # Configure logging
 logging.basicConfig(
@@ -17,11 +17,8 @@ logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
     # Load config for port
-    config_path = Path(__file__).parent.parent / "config" / "settings.yaml"
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        server_config = config.get("server", {})
+        server_config = get_settings().section("server")
         host = server_config.get("host", "0.0.0.0")
         port = server_config.get("port", 8080)
     except Exception as e:
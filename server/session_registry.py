@@ -0,0 +1,133 @@
+"""
+Session Registry - Bounded map of the API's live StageManagers
+Entries are evicted least-recently-used once the registry is full, and after
+sitting idle past the TTL. Evicted managers are closed, which cancels their
+fallback timers; the room's state stays in Redis, so a later request simply
+re-attaches to it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+from agents.stage_manager import StageManager
+
+logger = logging.getLogger(__name__)
+
+# Metrics
+SESSION_REGISTRY_SIZE = Gauge(
+    "api_session_registry_size", "StageManagers currently held by the API"
+)
+SESSION_REGISTRY_EVICTIONS = Counter(
+    "api_session_registry_evictions_total", "StageManagers evicted from the API registry", ("reason",)
+)
+
+
+class SessionRegistry:
+    """LRU + idle-TTL registry of StageManagers keyed by room id"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: float = 3600,
+        sweep_interval_seconds: float = 60
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # room id -> (manager, last used, monotonic); oldest first
+        self._entries: OrderedDict[str, tuple[StageManager, float]] = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._entries
+
+    def get(self, room_id: str) -> Optional[StageManager]:
+        """Look up a manager and mark it recently used (idle-expired ones are not returned)"""
+        entry = self._entries.get(room_id)
+        if entry is None:
+            return None
+        manager, last_used = entry
+        now = time.monotonic()
+        if now - last_used > self.idle_ttl_seconds:
+            self._evict(room_id, "idle")
+            return None
+        self._entries[room_id] = (manager, now)
+        self._entries.move_to_end(room_id)
+        return manager
+
+    def put(self, room_id: str, manager: StageManager):
+        """Add or replace a manager, evicting the least recently used ones if full"""
+        previous = self._entries.pop(room_id, None)
+        if previous is not None and previous[0] is not manager:
+            self._close(previous[0])
+        self._entries[room_id] = (manager, time.monotonic())
+        while len(self._entries) > self.max_sessions:
+            oldest = next(iter(self._entries))
+            self._evict(oldest, "capacity")
+        SESSION_REGISTRY_SIZE.set(len(self._entries))
+
+    def pop(self, room_id: str) -> Optional[StageManager]:
+        """Remove a manager without closing it (the caller owns it now)"""
+        entry = self._entries.pop(room_id, None)
+        SESSION_REGISTRY_SIZE.set(len(self._entries))
+        return entry[0] if entry else None
+
+    def evict_idle(self) -> int:
+        """Evict every entry idle past the TTL; returns how many were evicted"""
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        evicted = 0
+        # Oldest first, so stop at the first entry that is still fresh
+        for room_id, (_, last_used) in list(self._entries.items()):
+            if last_used > cutoff:
+                break
+            self._evict(room_id, "idle")
+            evicted += 1
+        return evicted
+
+    def _evict(self, room_id: str, reason: str):
+        manager, _ = self._entries.pop(room_id)
+        SESSION_REGISTRY_EVICTIONS.labels(reason=reason).inc()
+        SESSION_REGISTRY_SIZE.set(len(self._entries))
+        logger.info(f"Evicted session {room_id} from registry ({reason})")
+        self._close(manager)
+
+    def _close(self, manager: StageManager):
+        """Cancel the manager's timers and listener (its Redis state is kept)"""
+        task = asyncio.ensure_future(manager.close())
+        task.add_done_callback(_log_close_error)
+
+    def start(self):
+        """Start the periodic idle sweep"""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self):
+        try:
+            while True:
+                await asyncio.sleep(self.sweep_interval_seconds)
+                self.evict_idle()
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self):
+        """Stop sweeping and close every held manager"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+        managers = [manager for manager, _ in self._entries.values()]
+        self._entries.clear()
+        SESSION_REGISTRY_SIZE.set(0)
+        await asyncio.gather(*(manager.close() for manager in managers), return_exceptions=True)
+
+
+def _log_close_error(task: asyncio.Future):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Error closing evicted session: {task.exception()}")
@@ -0,0 +1,51 @@
+"""
+Status Reader - Read-only, single round-trip interview status lookups
+Used by GET /interview/{room_id}/status, which the monitor scripts and the
+dashboard poll constantly: it never creates a StageManager or writes to Redis.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import redis.asyncio as redis
+
+from agents.stage_manager import state_key
+
+
+@dataclass(frozen=True)
+class StageStatus:
+    """Snapshot of a room's stage state"""
+    room_id: str
+    stage: str
+    started_at: float  # epoch seconds, stamped by the Redis server clock
+    version: int
+    duration: float
+
+    @property
+    def started_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.started_at).isoformat()
+
+
+async def read_stage_status(redis_client: redis.Redis, room_id: str) -> Optional[StageStatus]:
+    """
+    Fetch a room's state hash and the Redis server time in one pipelined
+    round-trip. Duration is measured on the same clock that stamped the stage
+    start, so it does not depend on this process's clock. Returns None if the
+    room has no state.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hgetall(state_key(room_id))
+    pipe.time()
+    state, (seconds, microseconds) = await pipe.execute()
+
+    if not state or "stage" not in state:
+        return None
+    started_at = float(state.get("started_at", 0.0))
+    now = seconds + microseconds / 1_000_000
+    return StageStatus(
+        room_id=room_id,
+        stage=state["stage"],
+        started_at=started_at,
+        version=int(state.get("version", 0)),
+        duration=max(0.0, now - started_at),
+    )
@@ -0,0 +1,87 @@
+"""
+Shared fixtures - an in-memory stand-in for the Redis commands the agents use
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+
+class FakeScript:
+    """Runs the stage transition script's compare-and-set logic in Python"""
+
+    def __init__(self, redis_client: "FakeRedis"):
+        self.redis_client = redis_client
+
+    async def __call__(self, keys: List[str], args: List[Any]):
+        if self.redis_client.script_failures:
+            self.redis_client.script_failures -= 1
+            raise ConnectionError("Connection reset by peer")
+        expected_stage, expected_version, new_stage, _ttl, channel, origin = args
+        state = self.redis_client.hashes.get(keys[0], {})
+        stage, started_at, version = state.get("stage"), state.get("started_at"), int(state.get("version", 0))
+        if (expected_stage != "" and stage != expected_stage) or (
+            expected_version != "" and version != int(expected_version)
+        ):
+            return [0, stage or "", started_at or "0", version]
+        started_at = f"{time.time():.6f}"
+        version += 1
+        self.redis_client.hashes[keys[0]] = {"stage": new_stage, "started_at": started_at, "version": str(version)}
+        self.redis_client.published.append((channel, {"stage": new_stage, "version": version, "origin": origin}))
+        return [1, new_stage, started_at, version]
+
+
+class FakePipeline:
+    def __init__(self, redis_client: "FakeRedis"):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def rpush(self, key: str, *values: str):
+        self.commands.append(("rpush", key, values))
+
+    def expire(self, key: str, seconds: int):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        await self.redis_client.before_execute()
+        for command, key, values in self.commands:
+            if command == "rpush":
+                self.redis_client.lists.setdefault(key, []).extend(values)
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Hashes, lists, scripts and pipelines - just enough for the unit tests"""
+
+    def __init__(self):
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.lists: Dict[str, List[str]] = {}
+        self.published: List[tuple] = []
+        self.script_failures = 0
+        self.execute_delay: Optional[float] = None
+
+    def register_script(self, script: str) -> FakeScript:
+        return FakeScript(self)
+
+    async def hmget(self, key: str, *fields: str):
+        state = self.hashes.get(key, {})
+        return [state.get(field) for field in fields]
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.lists.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def before_execute(self):
+        if self.execute_delay:
+            import asyncio
+            await asyncio.sleep(self.execute_delay)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
@@ -0,0 +1,38 @@
+"""
+Conversation History - Bounded ring buffer with a rolling summary
+"""
+
+from agents.conversation_history import ConversationHistory
+
+
+def test_history_stays_bounded_and_summarizes_evicted_turns():
+    history = ConversationHistory(max_turns=4, summary_max_chars=200)
+    for i in range(10):
+        history.append("user" if i % 2 == 0 else "assistant", f"Turn number {i}. More detail follows.")
+
+    assert len(history) == 4
+    assert history.total_turns == 10
+    assert [turn.content.split(".")[0] for turn in history] == [f"Turn number {i}" for i in range(6, 10)]
+    assert "Turn number 5." in history.summary.text()
+
+    messages = history.to_messages()
+    assert messages[0]["role"] == "system"
+    assert messages[-1] == {"role": "assistant", "content": "Turn number 9. More detail follows."}
+
+
+def test_recent_is_a_live_view_of_the_ring():
+    history = ConversationHistory(max_turns=3)
+    recent = history.recent()
+    history.append("user", "first")
+    history.append("assistant", "second")
+
+    # Same object every time; no copy is built after an append
+    assert history.recent() is recent
+    assert len(recent) == 2
+    assert recent[-1].content == "second"
+
+    for i in range(5):
+        history.append("user", f"later {i}")
+    assert len(recent) == 3
+    assert [turn.content for turn in recent[1:]] == ["later 3", "later 4"]
+    assert history.last("assistant") is None
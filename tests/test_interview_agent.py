@@ -0,0 +1,72 @@
+"""
+Interview Agent - The agent's chat context stays bounded over a long interview
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+from agents.interview_agent import InterviewAssistant
+
+MAX_TURNS = 6
+
+
+def make_assistant() -> InterviewAssistant:
+    stage_manager = SimpleNamespace(
+        config={
+            "conversation": {"max_turns": MAX_TURNS},
+            "agents": {"experience": {"speculative": {"enabled": True, "debounce_seconds": 0.0}}},
+        },
+        redis_client=None,
+        get_stage=lambda: "experience",
+    )
+    return InterviewAssistant(stage_manager)
+
+
+def test_chat_ctx_stays_bounded_over_many_turns():
+    async def scenario():
+        assistant = make_assistant()
+        for i in range(50):
+            message = ChatMessage(role="user", content=[f"Answer number {i}"])
+            await assistant.on_user_turn_completed(ChatContext.empty(), message)
+            # What the session does around the hook: append the turn and the reply
+            chat_ctx = assistant.chat_ctx.copy()
+            chat_ctx.items.append(message)
+            chat_ctx.add_message(role="assistant", content=f"Follow-up number {i}")
+            await assistant.update_chat_ctx(chat_ctx)
+            assert len(assistant.chat_ctx.items) <= MAX_TURNS + 2
+
+        assert assistant.chat_ctx.items[-1].text_content == "Follow-up number 49"
+        assert len(assistant.conversation_history) == MAX_TURNS
+
+    asyncio.run(scenario())
+
+
+def test_llm_node_streams_a_draft_that_is_still_generating():
+    async def slow_draft(interim_text: str):
+        for word in ("What", "was", "the", "hardest", "part?"):
+            await asyncio.sleep(0.05)
+            yield word + " "
+
+    async def scenario():
+        assistant = make_assistant()
+        assistant.interim_drafts.draft_fn = slow_draft
+        text = "I led the migration of our billing service"
+        assistant.interim_drafts.on_user_input_transcribed(SimpleNamespace(transcript=text, is_final=False))
+        await asyncio.sleep(0.08)
+
+        chat_ctx = ChatContext.empty()
+        chat_ctx.add_message(role="user", content=text)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        arrivals = []
+        async for chunk in assistant.llm_node(chat_ctx, [], None):
+            arrivals.append((loop.time() - started, chunk))
+        return arrivals
+
+    arrivals = asyncio.run(scenario())
+    assert "".join(chunk for _, chunk in arrivals) == "What was the hardest part? "
+    # The first chunk is out immediately; the rest follow the generation
+    assert arrivals[0][0] < 0.01
+    assert arrivals[-1][0] > 0.1
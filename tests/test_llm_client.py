@@ -0,0 +1,51 @@
+"""
+LLM Client - Process-wide HTTP pool lifecycle
+"""
+
+import asyncio
+
+from livekit.agents.job import _JobContextVar
+
+from agents.llm_client import LLMClient, _get_shared_http_client, close_shared_http_clients
+
+POOL = dict(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0, http2=False)
+
+
+def test_pool_is_keyed_by_timeout():
+    async def scenario():
+        short = _get_shared_http_client("http://llm.invalid:11434", 5, **POOL)
+        again = _get_shared_http_client("http://llm.invalid:11434", 5, **POOL)
+        long = _get_shared_http_client("http://llm.invalid:11434", 60, **POOL)
+        await close_shared_http_clients()
+        return short, again, long
+
+    short, again, long = asyncio.run(scenario())
+    assert short is again
+    assert long is not short
+
+
+class FakeJobContext:
+    def __init__(self):
+        self.shutdown_callbacks = []
+
+    def add_shutdown_callback(self, callback):
+        self.shutdown_callbacks.append(callback)
+
+
+def test_pool_closes_once_on_job_shutdown():
+    async def scenario():
+        ctx = FakeJobContext()
+        token = _JobContextVar.set(ctx)
+        try:
+            first, second = LLMClient(), LLMClient()
+            pool = first.http_client
+            assert second.http_client is pool
+            # Registered once for the process, not once per client
+            assert len(ctx.shutdown_callbacks) == 1
+
+            await ctx.shutdown_callbacks[0]()
+            return pool.is_closed
+        finally:
+            _JobContextVar.reset(token)
+
+    assert asyncio.run(scenario()) is True
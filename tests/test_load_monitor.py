@@ -0,0 +1,37 @@
+"""
+Load Monitor - Job-process event-loop lag counts toward the reported load
+"""
+
+import os
+import subprocess
+import sys
+
+from agents.load_monitor import LoadMonitor
+from agents.metrics_server import MULTIPROC_ENV
+
+# A job process whose loop is lagging (still alive: it has not marked itself dead)
+LAGGING_JOB = """
+from agents.load_monitor import WORKER_LOOP_LAG
+WORKER_LOOP_LAG.set({lag})
+"""
+
+
+def test_job_loop_lag_drives_reported_load(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_ENV, str(tmp_path))
+    monitor = LoadMonitor(max_sessions=8, max_loop_lag_ms=200)
+    idle_load = monitor()
+
+    for lag in (0.03, 0.15):
+        subprocess.run(
+            [sys.executable, "-c", LAGGING_JOB.format(lag=lag)],
+            check=True, cwd=os.path.dirname(os.path.dirname(__file__))
+        )
+    load = monitor()
+
+    assert monitor._job_loop_lag() == 0.15
+    assert load >= 0.75 - 1e-9 > idle_load
+
+
+def test_no_multiprocess_dir_means_no_lag(monkeypatch):
+    monkeypatch.delenv(MULTIPROC_ENV, raising=False)
+    assert LoadMonitor()._job_loop_lag() == 0.0
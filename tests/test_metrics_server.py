@@ -0,0 +1,45 @@
+"""
+Metrics Server - One endpoint aggregates every job process, including exited ones
+"""
+
+import os
+import subprocess
+import sys
+import urllib.request
+
+from agents.load_monitor import LoadMonitor
+from agents.metrics_server import MULTIPROC_ENV, start_metrics_server
+
+JOB_PROCESS = """
+from agents.load_monitor import WORKER_LOOP_LAG
+from agents.metrics_server import mark_process_dead_at_exit
+from agents.transcript_buffer import TRANSCRIPT_FLUSHED
+mark_process_dead_at_exit()
+TRANSCRIPT_FLUSHED.inc({flushed})
+WORKER_LOOP_LAG.set({lag})
+"""
+
+
+def run_job_process(flushed: int, lag: float):
+    subprocess.run(
+        [sys.executable, "-c", JOB_PROCESS.format(flushed=flushed, lag=lag)],
+        check=True, cwd=os.path.dirname(os.path.dirname(__file__))
+    )
+
+
+def test_one_endpoint_serves_all_job_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_ENV, str(tmp_path))
+    run_job_process(flushed=3, lag=0.02)
+    run_job_process(flushed=4, lag=0.5)
+
+    monitor = LoadMonitor(max_sessions=4)
+    port = start_metrics_server(host="127.0.0.1", port=0, collector=monitor)
+    assert port
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+
+    # Counters outlive the processes that wrote them
+    assert "transcript_entries_flushed_total 7.0" in body
+    # Live gauges of exited processes are dropped from the aggregate
+    assert "worker_loop_lag_seconds " not in body
+    # The main process's own figures come from the load monitor
+    assert "worker_load 0.0" in body
@@ -0,0 +1,71 @@
+"""
+Ollama LLM - Streaming a long reply must not stall the event loop
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import ollama
+
+from agents.ollama_llm import OllamaLLM
+
+CHUNKS = 400
+CHUNK_DELAY = 0.002  # per-token pacing of the fake model server
+TICK = 0.005
+MAX_LAG = 0.05
+
+
+async def slow_chat_handler(request: httpx.Request) -> httpx.Response:
+    """Answers /api/chat like an Ollama server streaming one token per chunk"""
+    assert request.url.path == "/api/chat"
+
+    def line(content: str, done: bool) -> bytes:
+        return (json.dumps({"message": {"role": "assistant", "content": content}, "done": done}) + "\n").encode()
+
+    async def body():
+        for i in range(CHUNKS):
+            await asyncio.sleep(CHUNK_DELAY)
+            yield line(f"token{i} ", False)
+        yield line("", True)
+
+    return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=body())
+
+
+class FakeChatContext:
+    def items(self):
+        return [SimpleNamespace(role=SimpleNamespace(value="user"), content="Tell me about yourself")]
+
+
+def test_event_loop_lag_stays_bounded_during_long_stream():
+    async def scenario():
+        llm = OllamaLLM(model="test-model", base_url="http://ollama.invalid:11434", max_parallel=1)
+        # The real AsyncClient and httpx stack, with only the socket replaced
+        llm._client = ollama.AsyncClient(
+            host="http://ollama.invalid:11434", transport=httpx.MockTransport(slow_chat_handler)
+        )
+        done = asyncio.Event()
+        lags = []
+
+        async def ticker():
+            while not done.is_set():
+                scheduled = time.monotonic()
+                await asyncio.sleep(TICK)
+                lags.append(time.monotonic() - scheduled - TICK)
+
+        ticker_task = asyncio.create_task(ticker())
+        parts = []
+        async with llm.chat(chat_ctx=FakeChatContext()) as stream:
+            async for chunk in stream:
+                parts.append(chunk.delta.content)
+        done.set()
+        await ticker_task
+        return "".join(parts), lags
+
+    text, lags = asyncio.run(scenario())
+    assert text.startswith("token0 ") and text.endswith(f"token{CHUNKS - 1} ")
+    # The stream ran for ~1s; the ticker must have kept running throughout
+    assert len(lags) > 50
+    assert max(lags) < MAX_LAG
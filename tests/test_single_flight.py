@@ -0,0 +1,68 @@
+"""
+Single Flight - Coalescing identical in-flight requests
+"""
+
+import asyncio
+
+from agents.single_flight import SingleFlight
+
+
+def make_factory(calls):
+    def factory():
+        async def chunks():
+            calls.append(1)
+            for word in ("Tell ", "me ", "more."):
+                await asyncio.sleep(0.01)
+                yield word
+        return chunks()
+    return factory
+
+
+async def collect(flights, key, factory):
+    return "".join([chunk async for chunk in flights.stream(key, factory)])
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+        factory = make_factory(calls)
+        results = await asyncio.gather(*(collect(flights, "key", factory) for _ in range(3)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["Tell me more."] * 3
+    assert len(calls) == 1
+    assert stats["coalesced_calls"] == 2
+
+
+def test_caller_after_last_subscriber_left_gets_a_fresh_call():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+        factory = make_factory(calls)
+        first = flights.stream("key", factory)
+        await first.__anext__()
+        # The only subscriber leaves; the flight is cancelled but not yet unwound
+        await first.aclose()
+        return await collect(flights, "key", factory), flights.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == "Tell me more."
+    assert stats["upstream_calls"] == 2
+
+
+def test_cancelled_leader_is_replaced_for_waiting_callers():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+        factory = make_factory(calls)
+        callers = [asyncio.create_task(collect(flights, "key", factory)) for _ in range(2)]
+        await asyncio.sleep(0.015)  # the first chunk is out
+        leader = flights._flights["key"].task
+        leader.cancel()
+        results = await asyncio.gather(*callers)
+        return results, leader, flights.stats()
+
+    results, leader, stats = asyncio.run(scenario())
+    # Callers resume from the replacement call instead of failing
+    assert results == ["Tell me more."] * 2
+    assert leader.cancelled()
+    assert stats["upstream_calls"] == 2
@@ -0,0 +1,115 @@
+"""
+Speculative Drafter - Interim transcripts draft the reply the final one reuses
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from agents.speculative import InterimDrafts
+
+CONFIG = {
+    "agents": {
+        "experience": {
+            "speculative": {"enabled": True, "min_words": 4, "debounce_seconds": 0.0, "similarity_threshold": 0.9}
+        },
+        "self_intro": {},
+    }
+}
+
+
+def interim(text: str) -> SimpleNamespace:
+    return SimpleNamespace(transcript=text, is_final=False)
+
+
+class DraftRecorder:
+    def __init__(self, chunk_delay: float = 0.0):
+        self.calls = []
+        self.chunk_delay = chunk_delay
+
+    async def __call__(self, interim_text: str):
+        self.calls.append(interim_text)
+        for word in f"Follow-up to: {interim_text}".split(" "):
+            await asyncio.sleep(self.chunk_delay)
+            yield word + " "
+
+
+async def read(draft) -> str:
+    return "".join([chunk async for chunk in draft]).strip()
+
+
+def test_matching_final_transcript_reuses_draft():
+    async def scenario():
+        draft_fn = DraftRecorder()
+        drafts = InterimDrafts(lambda: "experience", CONFIG, draft_fn)
+        drafts.on_user_input_transcribed(interim("I led the migration of our billing"))
+        drafts.on_user_input_transcribed(interim("I led the migration of our billing service to Kubernetes"))
+        drafts.on_user_input_transcribed(
+            SimpleNamespace(transcript="I led the migration of our billing service to Kubernetes.", is_final=True)
+        )
+        await asyncio.sleep(0.01)  # let the draft start
+        draft = drafts.take("I led the migration of our billing service to Kubernetes.")
+        return await read(draft), draft_fn.calls
+
+    draft, calls = asyncio.run(scenario())
+    assert draft == "Follow-up to: I led the migration of our billing service to Kubernetes"
+    # The first draft was superseded before it ran; only one generation was used
+    assert calls == ["I led the migration of our billing service to Kubernetes"]
+
+
+def test_diverging_final_transcript_discards_draft():
+    async def scenario():
+        drafts = InterimDrafts(lambda: "experience", CONFIG, DraftRecorder())
+        drafts.on_user_input_transcribed(interim("I worked on the search team for two years"))
+        await asyncio.sleep(0.01)
+        return drafts.take("Actually I mostly did frontend work on the checkout page")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_stage_without_speculation_never_drafts():
+    async def scenario():
+        draft_fn = DraftRecorder()
+        drafts = InterimDrafts(lambda: "self_intro", CONFIG, draft_fn)
+        drafts.on_user_input_transcribed(interim("My name is Sam and I am a backend engineer"))
+        draft = drafts.take("My name is Sam and I am a backend engineer")
+        return draft, draft_fn.calls
+
+    assert asyncio.run(scenario()) == (None, [])
+
+
+def test_unfinished_draft_streams_from_its_buffer():
+    async def scenario():
+        draft_fn = DraftRecorder(chunk_delay=0.05)
+        drafts = InterimDrafts(lambda: "experience", CONFIG, draft_fn)
+        text = "I led the migration of our billing service to Kubernetes"
+        drafts.on_user_input_transcribed(interim(text))
+        await asyncio.sleep(0.12)  # end of turn arrives mid-generation
+
+        draft = drafts.take(text)
+        assert draft is not None and not draft.done
+        started = time.monotonic()
+        chunks = []
+        async for chunk in draft:
+            if not chunks:
+                first_chunk_after = time.monotonic() - started
+            chunks.append(chunk)
+        return first_chunk_after, "".join(chunks).strip()
+
+    first_chunk_after, text = asyncio.run(scenario())
+    # Buffered chunks are replayed at once, not after the whole draft
+    assert first_chunk_after < 0.01
+    assert text == "Follow-up to: I led the migration of our billing service to Kubernetes"
+
+
+def test_draft_still_debouncing_is_dropped():
+    config = {"agents": {"experience": {"speculative": {"enabled": True, "min_words": 4, "debounce_seconds": 5}}}}
+
+    async def scenario():
+        draft_fn = DraftRecorder()
+        drafts = InterimDrafts(lambda: "experience", config, draft_fn)
+        drafts.on_user_input_transcribed(interim("I led the migration of our billing service"))
+        await asyncio.sleep(0)
+        return drafts.take("I led the migration of our billing service"), draft_fn.calls
+
+    assert asyncio.run(scenario()) == (None, [])
@@ -0,0 +1,134 @@
+"""
+Stage Manager - Transitions stay consistent with the Redis state hash
+"""
+
+import asyncio
+
+from agents.stage_manager import StageManager, state_key
+
+
+def test_transition_succeeds_after_redis_error(fake_redis):
+    async def scenario():
+        manager = StageManager(redis_client=fake_redis)
+        await manager.initialize("room-1")
+        assert manager.version == 1
+
+        # One failed round-trip must not move the local copy ahead of Redis
+        fake_redis.script_failures = 2
+        assert not await manager.transition_to_next()
+        assert manager.current_stage == "start"
+        assert manager.version == 1
+
+        assert await manager.transition_to_next()
+        assert manager.current_stage == "self_intro"
+        assert fake_redis.hashes[state_key("room-1")]["stage"] == "self_intro"
+        assert manager.version == 2
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_transition_retries_once_after_transient_error(fake_redis):
+    async def scenario():
+        manager = StageManager(redis_client=fake_redis)
+        await manager.initialize("room-1")
+        fake_redis.script_failures = 1
+        assert await manager.transition_to_next()
+        assert manager.current_stage == "self_intro"
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_missing_state_is_reinitialized(fake_redis):
+    async def scenario():
+        manager = StageManager(redis_client=fake_redis)
+        await manager.initialize("room-1")
+        await manager.transition_to_next()
+
+        # The key expired: the transition re-creates it instead of sticking
+        await fake_redis.delete(state_key("room-1"))
+        assert await manager.transition_to_next()
+        assert manager.current_stage == "experience"
+        assert fake_redis.hashes[state_key("room-1")]["stage"] == "experience"
+        assert manager.version == int(fake_redis.hashes[state_key("room-1")]["version"])
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_refused_transition_adopts_stored_state(fake_redis):
+    async def scenario():
+        api = StageManager(redis_client=fake_redis)
+        await api.initialize("room-1")
+        agent = StageManager(redis_client=fake_redis)
+        await agent.attach("room-1")
+
+        assert await api.transition_to_next()
+        assert await api.transition_to_next()
+        # The agent decided from its stale copy: it is refused and adopts the
+        # stored state, without replaying the decision against it
+        assert not await agent.transition_to_next()
+        assert agent.current_stage == "experience"
+        assert agent.version == 3
+        assert fake_redis.hashes[state_key("room-1")]["stage"] == "experience"
+        await api.close()
+        await agent.close()
+
+    asyncio.run(scenario())
+
+
+def test_listening_manager_rearms_timer_for_remote_transition(fake_redis):
+    config = {
+        "stage_pipeline": {"order": ["start", "self_intro", "experience", "end"]},
+        "stages": {"self_intro": {"fallback_timeout_seconds": 0.3}, "experience": {}},
+    }
+
+    async def scenario():
+        api = StageManager(redis_client=fake_redis, config=config, run_timers=False)
+        await api.initialize("room-1")
+        agent = StageManager(redis_client=fake_redis, config=config)
+        await agent.attach("room-1")
+        # Stand-in for the pub/sub listener the agent process runs
+        agent._listener_task = asyncio.create_task(asyncio.sleep(10))
+
+        assert await api.transition_to_next()
+        await agent.refresh()  # what the listener does with the stage event
+        assert agent.current_stage == "self_intro"
+        assert agent._fallback_timer is not None and agent._fallback_timer.active
+        # The API drives transitions but does not host the room's deadlines
+        assert api._fallback_timer is None
+
+        await api.close()
+        await asyncio.wait_for(agent.wait_for_stage("experience"), timeout=2)
+        await agent.close()
+
+    asyncio.run(scenario())
+
+
+def test_overtaken_timer_never_fires(fake_redis):
+    config = {
+        "stage_pipeline": {"order": ["start", "self_intro", "experience", "end"]},
+        "stages": {"self_intro": {"fallback_timeout_seconds": 0.2}, "experience": {}},
+    }
+
+    async def scenario():
+        stale = StageManager(redis_client=fake_redis, config=config)
+        await stale.initialize("room-1")
+        assert await stale.transition_to_next()
+        other = StageManager(redis_client=fake_redis, config=config)
+        await other.attach("room-1")
+
+        # Another process moves the room on; the stale copy never hears of it
+        assert await other.transition_to_next()
+        assert stale.current_stage == "self_intro"
+
+        # The self_intro timer was armed for version 2, so its CAS is refused
+        await asyncio.sleep(0.5)
+        assert fake_redis.hashes[state_key("room-1")]["stage"] == "experience"
+        assert fake_redis.hashes[state_key("room-1")]["version"] == "3"
+        assert stale.current_stage == "experience"
+        await stale.close()
+        await other.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+"""
+Transcript Buffer - Closing the buffer must not lose the end of the transcript
+"""
+
+import asyncio
+
+from agents.transcript_buffer import TranscriptBuffer
+
+
+def test_aclose_waits_for_in_flight_flush(fake_redis):
+    async def scenario():
+        fake_redis.execute_delay = 0.05
+        buffer = TranscriptBuffer(fake_redis, "room-1", flush_interval=0.01, max_batch=5)
+        for i in range(6):
+            buffer.add("user", f"utterance {i}")
+        # Let the flusher pop the first batch and block in pipe.execute()
+        await asyncio.sleep(0.02)
+        await buffer.aclose()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert len(fake_redis.lists["interview:room-1:transcript"]) == 6
+    assert buffer.dropped == 0
+
+
+def test_aclose_counts_entries_it_could_not_write(fake_redis):
+    async def scenario():
+        fake_redis.execute_delay = 1.0
+        buffer = TranscriptBuffer(fake_redis, "room-1", flush_interval=0.01, max_batch=5)
+        for i in range(6):
+            buffer.add("user", f"utterance {i}")
+        await asyncio.sleep(0.02)
+        await buffer.aclose(timeout=0.05)
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert "interview:room-1:transcript" not in fake_redis.lists
+    assert buffer.dropped == 6